@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Server heartbeat pengganti (lokal) + generator beban untuk DataSender.
+
+    python3 heartbeat_server.py serve --port 26692 --record heartbeat.jsonl
+    python3 heartbeat_server.py serve --delay 2 --timeout-rate 0.1 --disconnect-rate 0.05
+    python3 heartbeat_server.py load --kiosks 300 --interval 1 --duration 60
+
+Arahkan kiosk ke server ini lewat kiosk.txt: heartbeat_host=127.0.0.1, heartbeat_port=26692.
+"""
+import sys, time, json, random, struct, asyncio, argparse
+
+# Harus sama dengan rfid_kantin_keyboard.py (lihat encode_telemetry)
+TELEMETRY_MAGIC = b"KT"
+TELEMETRY_HEADER = struct.Struct("!2sBH")
+# Batas tunggu respon di sisi kiosk (DataSender.IO_TIMEOUT)
+IO_TIMEOUT = 5.0
+READ_SIZE = 65536
+# Read yang penuh bisa berarti tulisan klien masih berlanjut walau frame terakhirnya utuh
+WRITE_GRACE = 0.02
+
+try:
+    # Decoder field lengkap ikut kiosk; kalau PySide6 tidak ada cukup tampil hex
+    from rfid_kantin_keyboard import decode_telemetry, encode_telemetry
+except ImportError:
+    decode_telemetry = encode_telemetry = None
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, max(0, -(-p * len(samples) // 100) - 1))]
+
+
+def split_payloads(data):
+    """Pisah buffer koneksi jadi payload lengkap: frame "KT" (pakai panjang) atau bacaan legacy.
+
+    Kembalikan (payloads, sisa). Sisa = frame yang belum lengkap, ditunggu dari read berikutnya.
+    Bacaan legacy tidak punya pemisah (satu bacaan per tulis), jadi sisa tanpa baris baru
+    yang bukan awal frame dianggap satu bacaan utuh.
+    """
+    payloads = []
+    pos = 0
+    while pos < len(data):
+        rest = data[pos:]
+        if rest.startswith(TELEMETRY_MAGIC) or TELEMETRY_MAGIC.startswith(rest):
+            if len(rest) < TELEMETRY_HEADER.size:
+                break
+            _, _, length = TELEMETRY_HEADER.unpack_from(data, pos)
+            end = pos + TELEMETRY_HEADER.size + length
+            if end > len(data):
+                break
+            payloads.append(("tlv", data[pos:end]))
+            pos = end
+            continue
+        end = data.find(b"\n", pos)
+        end = len(data) if end < 0 else end
+        line = data[pos:end].strip()
+        if line:
+            payloads.append(("legacy", line))
+        pos = end + 1
+    return payloads, data[pos:]
+
+
+def describe(kind, payload):
+    if kind == "legacy":
+        # QW30 + CPNY(7) + SN(6) + suhu
+        text = payload.decode(errors="replace")
+        return {"scr": text[:4], "cpny": text[4:11], "sn": text[11:17], "cpu_temp": text[17:]}
+    if decode_telemetry:
+        try:
+            return {k: v for k, v in decode_telemetry(payload).items() if isinstance(k, str)}
+        except (ValueError, struct.error, IndexError):
+            pass
+    return {"hex": payload.hex()}
+
+
+# ===== Server =====
+class HeartbeatServer:
+    """Terima heartbeat seperti server produksi, dengan gangguan yang bisa diatur."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.record = open(args.record, "a") if args.record else None
+        self.active = 0
+        self.connections = 0
+        self.payloads = 0
+        self.bytes = 0
+        self.faults = {"delay": 0, "timeout": 0, "disconnect": 0}
+        self.last_payloads = 0
+
+    async def read_message(self, reader):
+        """Kumpulkan satu tulisan klien (bisa terpecah di banyak read); None kalau koneksi ditutup."""
+        payloads, buffer = [], b""
+        data = await reader.read(READ_SIZE)
+        while data:
+            self.bytes += len(data)
+            complete, buffer = split_payloads(buffer + data)
+            payloads += complete
+            if buffer:
+                # frame terpotong di batas read: sisanya pasti menyusul
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    return None
+            elif len(data) == READ_SIZE:
+                # kebetulan berhenti di batas frame, tunggu sebentar kalau masih ada lanjutan
+                try:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), WRITE_GRACE)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                break
+        return payloads or None
+
+    async def handle(self, reader, writer):
+        peer = "%s:%s" % writer.get_extra_info("peername")[:2]
+        self.active += 1
+        self.connections += 1
+        try:
+            while True:
+                # satu jawaban per tulisan klien, walau flush antrean tlv ratusan KB
+                payloads = await self.read_message(reader)
+                if payloads is None:
+                    break
+                for kind, payload in payloads:
+                    self.payloads += 1
+                    if self.record:
+                        entry = {"t": time.time(), "peer": peer, "kind": kind}
+                        entry.update(describe(kind, payload))
+                        self.record.write(json.dumps(entry) + "\n")
+                    if self.args.verbose:
+                        print(f"📩 {peer} {kind}:", describe(kind, payload))
+
+                if self.rng.random() < self.args.disconnect_rate:
+                    # putus tanpa jawaban -> kiosk harus sambung ulang dan kirim ulang
+                    self.faults["disconnect"] += 1
+                    break
+                if self.rng.random() < self.args.timeout_rate:
+                    # diam saja -> recv di kiosk kena timeout
+                    self.faults["timeout"] += 1
+                    continue
+                if self.args.delay:
+                    self.faults["delay"] += 1
+                    await asyncio.sleep(self.rng.uniform(0, self.args.delay) if self.args.jitter else self.args.delay)
+                writer.write(self.args.reply.encode())
+                await writer.drain()
+                if self.args.close_after_reply:
+                    # perilaku server lama: satu koneksi satu heartbeat
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def report(self):
+        while True:
+            await asyncio.sleep(self.args.report)
+            rate = (self.payloads - self.last_payloads) / self.args.report
+            self.last_payloads = self.payloads
+            if self.record:
+                self.record.flush()
+            print(f"📊 koneksi aktif {self.active} (total {self.connections}) | "
+                  f"payload {self.payloads} ({rate:.0f}/dtk) | {self.bytes} byte | gangguan {self.faults}")
+
+    async def run(self):
+        server = await asyncio.start_server(self.handle, self.args.host, self.args.port,
+                                            backlog=self.args.backlog)
+        print(f"✅ Server heartbeat di {self.args.host}:{self.args.port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.report())
+
+
+# ===== Load Generator =====
+class LoadStats:
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.failures = 0
+        self.connects = 0
+        self.latency_ms = []
+
+
+def make_payload(kiosk, fmt, rng):
+    sn = "%06d" % kiosk
+    temp = rng.randint(40, 75)
+    if fmt == "tlv" and encode_telemetry:
+        return encode_telemetry({
+            "device": "QW304000100" + sn,
+            "uptime": int(time.monotonic()),
+            "cpu_temp": temp * 10,
+            "wifi": (1, rng.randint(30, 100)),
+        })
+    return ("QW304000100" + sn + str(temp)).encode()
+
+
+async def kiosk_client(kiosk, args, stats, stop_at):
+    """Satu kiosk palsu dengan pola DataSender: koneksi tetap, antre saat gagal, backoff."""
+    rng = random.Random(kiosk)
+    queue = []
+    reader = writer = None
+    backoff = args.backoff_min
+    retry_at = 0.0
+    # sebar waktu mulai supaya tidak semua kiosk kirim di detik yang sama
+    next_reading = time.monotonic() + rng.uniform(0, args.interval)
+    while time.monotonic() < stop_at:
+        now = time.monotonic()
+        if now >= next_reading:
+            queue.append(make_payload(kiosk, args.format, rng))
+            next_reading = now + args.interval
+        if queue and now >= retry_at:
+            try:
+                if writer is not None and reader.at_eof():
+                    # server sudah menutup koneksi yang disimpan
+                    writer.close()
+                    reader = writer = None
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(args.host, args.port), IO_TIMEOUT)
+                    stats.connects += 1
+                # tlv: antrean dalam satu tulis; legacy: satu bacaan per tulis
+                batch = list(queue) if args.format == "tlv" else queue[:1]
+                started = time.perf_counter()
+                writer.write(b"".join(batch))
+                await writer.drain()
+                stats.sent += len(batch)
+                try:
+                    response = await asyncio.wait_for(reader.read(1024), IO_TIMEOUT)
+                except asyncio.TimeoutError:
+                    response = None
+                if response == b"":
+                    raise ConnectionError("server menutup koneksi tanpa respon")
+                del queue[:len(batch)]
+                if response:
+                    stats.acked += len(batch)
+                    stats.latency_ms.append((time.perf_counter() - started) * 1000)
+                backoff = args.backoff_min
+            except (OSError, asyncio.TimeoutError):
+                stats.failures += 1
+                if writer is not None:
+                    writer.close()
+                reader = writer = None
+                retry_at = now + backoff * rng.uniform(0.8, 1.2)
+                backoff = min(backoff * 2, args.backoff_max)
+        wait = next_reading - time.monotonic()
+        if queue:
+            wait = min(wait, retry_at - time.monotonic())
+        await asyncio.sleep(max(wait, 0.01))
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(args):
+    stats = LoadStats()
+    started = time.monotonic()
+    stop_at = started + args.duration
+    print(f"🚀 {args.kiosks} kiosk -> {args.host}:{args.port}, tiap {args.interval} dtk selama {args.duration} dtk")
+    await asyncio.gather(*(kiosk_client(k + 1, args, stats, stop_at) for k in range(args.kiosks)))
+    elapsed = time.monotonic() - started
+    print(f"📊 terkirim {stats.sent} | dijawab {stats.acked} ({stats.acked / elapsed:.0f}/dtk) | "
+          f"gagal {stats.failures} | koneksi {stats.connects}")
+    print("⏱️ respon server p50 %.1f ms | p95 %.1f ms | p99 %.1f ms" % tuple(
+        percentile(stats.latency_ms, p) for p in (50, 95, 99)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="jalankan server heartbeat lokal")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=26692)
+    serve.add_argument("--backlog", type=int, default=1024)
+    serve.add_argument("--reply", default="OK\n", help="jawaban untuk tiap kiriman")
+    serve.add_argument("--record", help="simpan payload ke file JSONL")
+    serve.add_argument("--delay", type=float, default=0.0, help="tunda jawaban (detik)")
+    serve.add_argument("--jitter", action="store_true", help="tunda acak 0..delay")
+    serve.add_argument("--timeout-rate", type=float, default=0.0, help="peluang tidak menjawab")
+    serve.add_argument("--disconnect-rate", type=float, default=0.0, help="peluang memutus koneksi")
+    serve.add_argument("--close-after-reply", action="store_true", help="tutup koneksi setelah menjawab")
+    serve.add_argument("--report", type=float, default=5.0, help="jarak cetak statistik (detik)")
+    serve.add_argument("--seed", type=int)
+    serve.add_argument("-v", "--verbose", action="store_true")
+
+    load = sub.add_parser("load", help="simulasi banyak kiosk mengirim heartbeat")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=26692)
+    load.add_argument("--kiosks", type=int, default=100)
+    load.add_argument("--interval", type=float, default=60.0)
+    load.add_argument("--duration", type=float, default=120.0)
+    load.add_argument("--format", choices=("legacy", "tlv"), default="legacy")
+    load.add_argument("--backoff-min", type=float, default=2.0)
+    load.add_argument("--backoff-max", type=float, default=300.0)
+
+    args = parser.parse_args(argv)
+    if args.command == "load" and args.format == "tlv" and not encode_telemetry:
+        print("⚠️ encode_telemetry tidak tersedia (PySide6?), pakai legacy")
+        args.format = "legacy"
+    try:
+        if args.command == "serve":
+            asyncio.run(HeartbeatServer(args).run())
+        else:
+            asyncio.run(run_load(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
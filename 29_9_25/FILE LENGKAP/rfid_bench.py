@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Benchmark latensi tap -> DOM lewat pipeline asli kiosk, pakai reader palsu (rfid_simulator).
+
+    python3 rfid_bench.py                                  # laju 5,20,50,100,200 tap/dtk
+    python3 rfid_bench.py --rates 10,50 --count 300 --mode line --delivery javascript
+    QT_QPA_PLATFORM=offscreen python3 rfid_bench.py --json hasil.json
+
+Jalur yang diukur: pty -> SerialThread (decode, dedup, jurnal) -> WebApp.handle_rfid ->
+delivery -> window.__kiosk.tap di halaman. "DOM" = saat event 'kiosk-tap' diterima halaman,
+"konfirmasi" = saat hasil tap kembali ke Python (Bridge.tapResult / callback runJavaScript).
+"""
+import os, sys, time, json, tempfile, argparse, threading
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QTimer
+
+import rfid_kantin_keyboard as kiosk
+from rfid_simulator import RfidSimulator
+
+BENCH_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="UTF-8"><title>RFID Bench</title></head>
+<body>
+<input id="card" autofocus style="font-size:32px">
+<script>
+    // waktu epoch (ms) saat tap sampai di DOM, dibandingkan dengan time.time() di Python
+    window.__bench = [];
+    document.addEventListener('kiosk-tap', function (e) {
+        window.__bench.push([e.detail.id, performance.timeOrigin + performance.now()]);
+    });
+    document.getElementById('card').focus();
+</script>
+</body></html>
+"""
+# Tunggu sisa tap terkonfirmasi setelah simulator selesai (detik)
+DRAIN_TIMEOUT = 5.0
+
+
+def percentile(samples, p):
+    return kiosk.KioskStats.percentiles(samples, (p,))[0]
+
+
+class BenchApp(kiosk.WebApp):
+    """WebApp asli, hanya halaman dan service diganti: tanpa WiFi/heartbeat, reader = pty."""
+
+    def __init__(self, args, page_url, sim):
+        self.args = args
+        self.page_url = page_url
+        self.sim = sim
+        self.sent = {}       # card_id -> time.time() saat byte terakhir ditulis
+        self.confirmed = {}  # card_id -> time.time() saat hasil tap kembali
+        self.seq_card = {}
+        self.results = []
+        self.rates = list(args.rates)
+        self.started = False
+        super().__init__()
+
+    def start_url(self):
+        return self.page_url
+
+    def boot_services(self):
+        self.start_reader()
+        self.profiler.mark("service reader")
+
+    def on_page_loaded(self, success):
+        super().on_page_loaded(success)
+        if success and not self.started:
+            self.started = True
+            self.wait_ready()
+
+    def wait_ready(self):
+        # webchannel baru siap beberapa saat setelah loadFinished
+        def check(ready):
+            if ready and self.serial_thread.readers[0].ser is not None:
+                QTimer.singleShot(200, self.next_rate)
+            else:
+                QTimer.singleShot(100, self.wait_ready)
+
+        self.browser.page().runJavaScript(
+            "!!(window.__kiosk && window.__kiosk.bridge && window.__kiosk.inputFocused)", check)
+
+    def handle_rfid(self, event):
+        self.seq_card[event.seq] = event.card_id
+        super().handle_rfid(event)
+
+    def on_tap_result(self, seq, ok, attempted=True):
+        # tap yang gagal/tidak dicoba bisa dikirim ulang antrean, seq-nya tetap disimpan
+        card_id = self.seq_card.pop(seq, None) if ok else None
+        if card_id is not None:
+            self.confirmed[card_id] = time.time()
+        super().on_tap_result(seq, ok, attempted)
+
+    def next_rate(self):
+        if not self.rates:
+            self.finish()
+            return
+        rate = self.rates.pop(0)
+        base = 0xB000000000 + (len(self.results) << 24)
+        self.sent.clear()
+        self.confirmed.clear()
+        self.corrupted_before = self.sim.corrupted
+
+        def record(card_id, sent_at):
+            self.sent[card_id] = sent_at
+
+        thread = threading.Thread(target=self.sim.run, daemon=True, args=(
+            lambda n: "%010X" % (base + n), rate, self.args.count, self.args.jitter,
+            self.args.corrupt, 1, record))
+        thread.start()
+        self.drain(rate, thread, None)
+
+    def drain(self, rate, thread, deadline):
+        if thread.is_alive():
+            QTimer.singleShot(50, lambda: self.drain(rate, thread, None))
+            return
+        deadline = deadline or time.monotonic() + DRAIN_TIMEOUT
+        expected = len(self.sent) - (self.sim.corrupted - self.corrupted_before)
+        if len(self.confirmed) < expected and time.monotonic() < deadline:
+            QTimer.singleShot(50, lambda: self.drain(rate, thread, deadline))
+            return
+        self.browser.page().runJavaScript(
+            "JSON.stringify(window.__bench.splice(0))",
+            lambda dom: self.collect(rate, json.loads(dom or "[]")))
+
+    def collect(self, rate, dom):
+        sent = dict(self.sent)
+        dom_ms = [(t / 1000.0 - sent[card_id]) * 1000 for card_id, t in dom if card_id in sent]
+        confirm_ms = [(t - sent[card_id]) * 1000 for card_id, t in self.confirmed.items() if card_id in sent]
+        delivered = len(dom_ms)
+        if dom:
+            span = max(t for _, t in dom) / 1000.0 - min(sent.values())
+        else:
+            span = 0.0
+        lost = len(sent) - (self.sim.corrupted - self.corrupted_before) - delivered
+        row = {
+            "rate": rate,
+            "sent": len(sent),
+            "delivered": delivered,
+            "lost": max(lost, 0),
+            "throughput": delivered / span if span > 0 else 0.0,
+            "dom_p50": percentile(dom_ms, 50),
+            "dom_p95": percentile(dom_ms, 95),
+            "dom_p99": percentile(dom_ms, 99),
+            "dom_max": max(dom_ms, default=0.0),
+            "confirm_p50": percentile(confirm_ms, 50),
+            "confirm_p99": percentile(confirm_ms, 99),
+        }
+        row["sustained"] = row["lost"] == 0 and row["dom_p99"] <= self.args.slo
+        self.results.append(row)
+        print("%6.0f/dtk  %5d  %5d  %4d  %7.1f/dtk  %7.1f  %7.1f  %7.1f  %7.1f  %7.1f  %7.1f  %s" % (
+            rate, row["sent"], delivered, row["lost"], row["throughput"],
+            row["dom_p50"], row["dom_p95"], row["dom_p99"], row["dom_max"],
+            row["confirm_p50"], row["confirm_p99"], "✅" if row["sustained"] else "❌"), flush=True)
+        QTimer.singleShot(300, self.next_rate)
+
+    def finish(self):
+        sustained = [r for r in self.results if r["sustained"]]
+        if sustained:
+            best = max(sustained, key=lambda r: r["rate"])
+            print(f"🏁 Laju maksimal yang bertahan (p99 DOM <= {self.args.slo:.0f} ms, tanpa hilang): "
+                  f"{best['rate']:.0f} tap/dtk, throughput {best['throughput']:.1f} tap/dtk")
+        else:
+            print(f"🏁 Tidak ada laju yang memenuhi p99 DOM <= {self.args.slo:.0f} ms tanpa tap hilang")
+        if self.args.json:
+            with open(self.args.json, "w") as f:
+                json.dump({"args": vars(self.args), "results": self.results}, f, indent=2)
+        self.close()
+        QApplication.instance().quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="5,20,50,100,200",
+                        type=lambda s: [float(x) for x in s.split(",") if x])
+    parser.add_argument("--count", type=int, default=200, help="tap per laju")
+    parser.add_argument("--mode", choices=("frame", "line"), default="line")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--corrupt", type=float, default=0.0)
+    parser.add_argument("--delivery", choices=sorted(kiosk.DELIVERY_BACKENDS), default="webchannel")
+    parser.add_argument("--journal", default=None,
+                        help="file jurnal tap (default file sementara, off = tanpa jurnal)")
+    parser.add_argument("--slo", type=float, default=100.0, help="batas p99 tap->DOM (ms)")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="rfid-bench-")
+    page = os.path.join(workdir, "bench.html")
+    with open(page, "w") as f:
+        f.write(BENCH_PAGE)
+
+    sim = RfidSimulator(args.mode, seed=args.seed)
+    port = sim.open()
+    # Pipeline asli dengan setting bench: tiap tap ID unik, tanpa dedup/daftar kartu.
+    # Mirror dan profil web produksi dimatikan: tidak ada precache lewat jaringan saat
+    # mengukur dan cache profil kiosk tidak ikut terisi halaman bench
+    kiosk.CONFIG.update({
+        "reader1": port,
+        "delivery": args.delivery,
+        "dedup_window": "0",
+        "card_policy": "off",
+        "mirror": "0",
+        "web_profile": "off",
+        "journal": os.path.join(workdir, "taps.db") if args.journal is None else args.journal,
+    })
+    for key in [k for k in kiosk.CONFIG if k.startswith("reader") and k != "reader1"]:
+        del kiosk.CONFIG[key]
+
+    print(f"🔌 Reader palsu {port} ({args.mode}), delivery {args.delivery}, "
+          f"jurnal {kiosk.CONFIG['journal']}")
+    print("   laju    kirim  masuk hilang  throughput   DOM p50  DOM p95  DOM p99  DOM max  konf p50 konf p99")
+
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    app.setStyleSheet(kiosk.KEYBOARD_QSS)
+    window = BenchApp(args, "file://" + page, sim)
+    try:
+        app.exec()
+    finally:
+        sim.close()
+    return 0 if any(r["sustained"] for r in window.results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,110 +1,403 @@
 #!/usr/bin/env python3
-import sys, time, threading, subprocess
+import time
+BOOT_T0 = time.perf_counter()  # acuan --profile-startup, diambil sebelum import berat
+
+import sys, os, re, json, glob, mmap, ctypes, sqlite3, threading, subprocess, selectors, traceback
+from collections import namedtuple, OrderedDict
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QGridLayout, QMenu
+    QPushButton, QGridLayout, QMenu, QStackedWidget
 )
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import Qt, QThread, Signal, QTimer, QObject, Slot, QUrl
-from PySide6.QtWebChannel import QWebChannel
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QObject, Slot, SLOT, QUrl, QFile, QIODevice, QByteArray
+from PySide6.QtDBus import QDBus, QDBusConnection, QDBusMessage, QDBusObjectPath, QDBusVariant
 from PySide6.QtGui import QPainter, QColor, QAction
-import serial, pyautogui
+# serial dan pyautogui di-import saat dipakai (lihat SerialThread / PyAutoGuiDelivery)
 
 PORT = "/dev/serial/by-id/usb-Espressif_USB_JTAG_serial_debug_unit_94:A9:90:98:0B:78-if00"
 BAUD = 115200
 
+
+# ===== Konfigurasi per kiosk (kiosk.txt) =====
+def load_config(path="kiosk.txt"):
+    """Baca kiosk.txt berformat nama=nilai, baris '#' diabaikan."""
+    config = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                config[key.strip()] = value.strip()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("⚠️ Gagal baca kiosk.txt, pakai default:", e)
+    return config
+
+CONFIG = load_config()
+
+def cfg(key, default):
+    """Ambil setting dari kiosk.txt, dikonversi mengikuti tipe default."""
+    value = CONFIG.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        if isinstance(default, bool):
+            return value.lower() in ("1", "true", "yes", "ya", "on")
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+    except ValueError:
+        print(f"⚠️ Nilai {key}={value} tidak valid, pakai default {default}")
+        return default
+    return value
+
 import socket
+import select
+import struct
+import random
+from collections import deque
+
+# ===== Telemetry =====
+# Frame: "KT" | versi (u8) | panjang body (u16) | body = record TLV: tag (u8) | panjang (u8) | nilai
+# Semua angka big-endian. Server cukup lompati tag yang belum dikenal, jadi field baru
+# bisa ditambah tanpa menaikkan versi.
+TELEMETRY_MAGIC = b"KT"
+TELEMETRY_VERSION = 1
+TELEMETRY_HEADER = struct.Struct("!2sBH")
+TELEMETRY_FIELDS = {
+    # nama: (tag, format nilai)
+    "device": (1, None),           # ASCII SCR+CPNY+SN
+    "uptime": (2, "!I"),           # detik sejak aplikasi jalan
+    "cpu_temp": (3, "!h"),         # 0.1 °C
+    "loadavg": (4, "!HHH"),        # 1/5/15 menit x100
+    "memory": (5, "!II"),          # MemAvailable, MemTotal (kB)
+    "wifi": (6, "!Bb"),            # tersambung (0/1), kualitas sinyal (%)
+    "readers": (7, "!BB"),         # reader tersambung, jumlah reader
+    "taps": (8, "!IIII"),          # diterima, ganda, ditolak, terkirim
+    "latency": (9, "!HHH"),        # tap->halaman p50/p95/p99 (0.1 ms)
+    "queue": (10, "!HHHHII"),      # antrean tap: kedalaman, puncak, tunggu p50/p99 (ms), dibuang, kedaluwarsa
+}
+TELEMETRY_TAGS = {tag: (name, fmt) for name, (tag, fmt) in TELEMETRY_FIELDS.items()}
+
+
+def encode_telemetry(fields):
+    """dict nama -> nilai (tuple untuk field multi-angka) jadi satu frame biner."""
+    body = bytearray()
+    for name, value in fields.items():
+        tag, fmt = TELEMETRY_FIELDS[name]
+        if fmt is None:
+            raw = value.encode()
+        else:
+            raw = struct.pack(fmt, *(value if isinstance(value, tuple) else (value,)))
+        body += struct.pack("!BB", tag, len(raw)) + raw
+    return TELEMETRY_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, len(body)) + body
+
+
+def decode_telemetry(frame):
+    """Kebalikan encode_telemetry; tag tak dikenal disimpan sebagai bytes mentah."""
+    magic, version, length = TELEMETRY_HEADER.unpack_from(frame)
+    if magic != TELEMETRY_MAGIC:
+        raise ValueError("bukan frame telemetri")
+    body = memoryview(frame)[TELEMETRY_HEADER.size:TELEMETRY_HEADER.size + length]
+    fields = {"version": version}
+    pos = 0
+    while pos < len(body):
+        tag, size = body[pos], body[pos + 1]
+        raw = bytes(body[pos + 2:pos + 2 + size])
+        pos += 2 + size
+        name, fmt = TELEMETRY_TAGS.get(tag, (tag, None))
+        if fmt is None:
+            fields[name] = raw.decode(errors="replace") if name == "device" else raw
+        else:
+            value = struct.unpack(fmt, raw)
+            fields[name] = value[0] if len(value) == 1 else value
+    return fields
 
-class DataSender(QObject):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.ip = "103.108.131.236"
-        self.port = 26692
 
-        # buat timer 10 menit (600000 ms)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.send_data)
-        self.timer.start(60000)  # 10 menit
+def read_meminfo():
+    """(MemAvailable, MemTotal) dalam kB dari /proc/meminfo."""
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                if key in ("MemAvailable", "MemTotal"):
+                    info[key] = int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return info.get("MemAvailable", 0), info.get("MemTotal", 0)
 
-    def get_cpu_temp(self):
+
+class KioskStats:
+    """Angka operasional dari GUI, reader dan WiFi; dibaca DataSender untuk telemetri."""
+    LATENCY_SAMPLES = 512
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.serial_thread = None
+        self.tap_queue = None
+        self.wifi_connected = False
+        self.wifi_quality = 0
+        self.delivered = 0
+        self.failed = 0
+        # ms dari frame terbaca sampai halaman mengonfirmasi tap
+        self.latency_ms = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def update_wifi(self, connected, quality):
+        self.wifi_connected = connected
+        self.wifi_quality = quality
+
+    def record_tap(self, ok, latency_ms=None):
+        if ok:
+            self.delivered += 1
+        else:
+            self.failed += 1
+        if latency_ms is not None:
+            self.latency_ms.append(latency_ms)
+
+    @staticmethod
+    def percentiles(samples, points=(50, 95, 99)):
+        """Persentil nearest-rank; 0.0 kalau belum ada sampel."""
+        samples = sorted(samples)
+        if not samples:
+            return tuple(0.0 for _ in points)
+        return tuple(samples[min(len(samples) - 1, max(0, -(-p * len(samples) // 100) - 1))] for p in points)
+
+    def latency_percentiles(self, points=(50, 95, 99)):
+        return self.percentiles(self.latency_ms, points)
+
+    def reader_counts(self):
+        serial = self.serial_thread
+        if serial is None:
+            return 0, 0
+        return sum(r.ser is not None for r in serial.readers), len(serial.readers)
+
+    def tap_counts(self):
+        serial = self.serial_thread
+        if serial is None:
+            return 0, 0, 0, self.delivered
+        dedup = serial.dedup.stats()
+        return dedup["accepted"], dedup["suppressed"], serial.rejected, self.delivered
+
+    def queue_counts(self, clamp16):
+        if self.tap_queue is None:
+            return 0, 0, 0, 0, 0, 0
+        q = self.tap_queue.stats()
+        return (q["depth"], q["max_depth"], clamp16(q["wait_p50"]), clamp16(q["wait_p99"]),
+                min(q["dropped"], 0xFFFFFFFF), min(q["expired"], 0xFFFFFFFF))
+
+    def snapshot(self, device_id, cpu_temp_milli):
+        """Field telemetri siap di-encode."""
+        def clamp16(value):
+            return max(0, min(0xFFFF, int(round(value))))
+
+        load = os.getloadavg() if hasattr(os, "getloadavg") else (0.0, 0.0, 0.0)
+        return {
+            "device": device_id,
+            "uptime": int(time.monotonic() - self.started),
+            "cpu_temp": max(-32768, min(32767, cpu_temp_milli // 100)),
+            "loadavg": tuple(clamp16(x * 100) for x in load),
+            "memory": read_meminfo(),
+            "wifi": (int(bool(self.wifi_connected)), max(-128, min(127, int(self.wifi_quality)))),
+            "readers": self.reader_counts(),
+            "taps": tuple(min(x, 0xFFFFFFFF) for x in self.tap_counts()),
+            "latency": tuple(clamp16(x * 10) for x in self.latency_percentiles()),
+            "queue": self.queue_counts(clamp16),
+        }
+
+
+# ===== Heartbeat =====
+class DataSender(QThread):
+    """Heartbeat ke server di thread sendiri: koneksi TCP dipakai ulang (keep-alive),
+    bacaan ditampung selama offline lalu dikirim saat tersambung lagi.
+
+    heartbeat_format "legacy": string SCR+CPNY+SN+suhu seperti server lama, satu bacaan per
+                               tulis (server lama tidak punya pemisah, satu koneksi satu bacaan)
+    heartbeat_format "tlv"   : frame telemetri biner (lihat encode_telemetry), antrean dikirim
+                               sekaligus dalam satu tulis karena tiap frame membawa panjangnya
+    """
+    # Batas tunggu connect/respon server (detik)
+    IO_TIMEOUT = 5
+    BACKOFF_MIN = 2.0
+    # Data dasar
+    SCR = "QW30"
+    CPNY = "4000100"
+    SN = "000001"
+
+    def __init__(self, stats=None):
+        super().__init__()
+        self.ip = cfg("heartbeat_host", "103.108.131.236")
+        self.port = cfg("heartbeat_port", 26692)
+        self.interval = cfg("heartbeat_interval", 60)
+        self.backoff_max = cfg("heartbeat_backoff_max", 300.0)
+        self.stats = stats or KioskStats()
+        self.format = cfg("heartbeat_format", "legacy")
+        if self.format not in ("legacy", "tlv"):
+            print(f"⚠️ heartbeat_format={self.format} tidak dikenal, pakai legacy")
+            self.format = "legacy"
+        # Bacaan yang belum terkirim; paling lama dibuang kalau offline terlalu lama
+        self.queue = deque(maxlen=cfg("heartbeat_queue_max", 1440))
+        self.sock = None
+        self.backoff = self.BACKOFF_MIN
+        self.retry_at = 0.0
+        self.wake = threading.Event()
+        self.running = True
+
+    def read_cpu_millideg(self):
         try:
             with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                temp = int(f.read().strip()) // 1000  # hasil integer
-            return str(temp)
+                return int(f.read().strip())
         except:
-            return "0"
+            return 0
 
-    def send_data(self):
+    def get_cpu_temp(self):
+        return str(self.read_cpu_millideg() // 1000)  # hasil integer
+
+    def make_payload(self):
+        if self.format == "tlv":
+            device = self.SCR + self.CPNY + self.SN
+            return encode_telemetry(self.stats.snapshot(device, self.read_cpu_millideg()))
+        # Gabungkan semua data, contoh: QW30400010000000142
+        return (self.SCR + self.CPNY + self.SN + self.get_cpu_temp()).encode()
+
+    def describe(self, payload):
+        if self.format == "tlv":
+            return f"telemetri v{TELEMETRY_VERSION} {len(payload)} byte"
+        return payload.decode()
+
+    def connect_server(self):
+        sock = socket.create_connection((self.ip, self.port), timeout=self.IO_TIMEOUT)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Deteksi koneksi mati tanpa menunggu default kernel (2 jam)
+        for opt, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+            if hasattr(socket, opt):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), value)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        print(f"🔗 Tersambung ke server {self.ip}:{self.port}")
+        return sock
+
+    def peer_closed(self):
+        """True kalau server sudah menutup koneksi yang disimpan."""
         try:
-            # Data dasar
-            SCR = "QW30"
-            CPNY = "4000100"
-            SN = "000001"
-
-            # Tambah suhu CPU (integer)
-            cpu_temp = self.get_cpu_temp()
-
-            # Gabungkan semua data
-            data = SCR + CPNY + SN  + cpu_temp  # contoh: QW304000100000001|42
-
-            # Kirim ke server pakai TCP
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(5)
-                s.connect((self.ip, self.port))
-                s.sendall(data.encode())
-                # Tunggu respon dari server
-                try:
-                    response = s.recv(1024).decode().strip()
-                except socket.timeout:
-                    response = "⚠️ Tidak ada respon dari server"
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            # koneksi idle hanya "terbaca" kalau server menutup (recv -> b"")
+            return bool(readable) and self.sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def close_socket(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def exchange(self, data):
+        """Satu tulis lalu tunggu respon. Koneksi simpanan yang ternyata sudah ditutup server
+        (server lama menutup setelah menjawab) diganti koneksi baru satu kali."""
+        reused = self.sock is not None
+        if reused and self.peer_closed():
+            self.close_socket()
+            reused = False
+        if self.sock is None:
+            self.sock = self.connect_server()
+        try:
+            self.sock.sendall(data)
+            response = self.sock.recv(1024)
+            if not response:
+                # ditutup tanpa jawaban: anggap gagal, bacaan tetap di antrean
+                raise ConnectionError("server menutup koneksi tanpa respon")
+            return response.decode(errors="replace").strip()
+        except socket.timeout:
+            # jawaban yang terlambat jangan sampai terbaca sebagai respon heartbeat berikutnya
+            self.close_socket()
+            return "⚠️ Tidak ada respon dari server"
+        except OSError:
+            if not reused:
+                raise
+            self.close_socket()
+            return self.exchange(data)
+
+    def flush(self):
+        """Kirim semua bacaan yang tertahan: tlv dalam satu tulis, legacy satu per satu."""
+        sent = 0
+        while self.queue:
+            batch = list(self.queue) if self.format == "tlv" else [self.queue[0]]
+            response = self.exchange(b"".join(batch))
+            for _ in batch:
+                self.queue.popleft()
+            sent += len(batch)
+        if sent > 1:
+            print(f"✅ {sent} data tertunda terkirim")
+        print(f"✅ Data terkirim: {self.describe(batch[-1])}")
+        print(f"📩 Respon server: {response}")
 
-            print(f"✅ Data terkirim: {data}")
-            print(f"📩 Respon server: {response}")
+    def run(self):
+        next_reading = time.monotonic() + self.interval
+        while self.running:
+            now = time.monotonic()
+            if now >= next_reading:
+                self.queue.append(self.make_payload())
+                next_reading = now + self.interval
+            if self.queue and now >= self.retry_at:
+                try:
+                    self.flush()
+                    self.backoff = self.BACKOFF_MIN
+                except Exception as e:
+                    self.close_socket()
+                    # Backoff eksponensial + jitter supaya kiosk tidak menyerbu server bersamaan
+                    self.retry_at = now + self.backoff * random.uniform(0.8, 1.2)
+                    print(f"❌ Gagal kirim data ({len(self.queue)} tertunda, coba lagi {self.backoff:.0f} dtk):", e)
+                    self.backoff = min(self.backoff * 2, self.backoff_max)
+            wait = next_reading - time.monotonic()
+            if self.queue:
+                wait = min(wait, self.retry_at - time.monotonic())
+            self.wake.wait(max(wait, 0.05))
+        self.close_socket()
 
-        except Exception as e:
-            print("❌ Gagal kirim data:", e)
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        self.wait()
 
 
 # ===== WiFi Monitor =====
 class WiFiMonitor(QThread):
-    wifi_status_changed = Signal(str, bool)
+    """Fallback status WiFi lewat nmcli (dipakai kalau D-Bus NetworkManager tidak ada)."""
+    wifi_status_changed = Signal(str, bool, int)
     
     def __init__(self):
         super().__init__()
         self.running = True
         self.current_ssid = ""
+        self.current_connected = False
         self.current_quality = 0
 
-    def get_wifi_info(self):
+    def get_wifi_status(self):
+        """SSID, status, dan kualitas sinyal dalam satu panggilan nmcli."""
         try:
-            result = subprocess.run(['nmcli', '-t', '-f', 'ACTIVE,SSID', 'dev', 'wifi'], 
+            result = subprocess.run(['nmcli', '-t', '-f', 'ACTIVE,SSID,SIGNAL', 'dev', 'wifi'], 
                                   capture_output=True, text=True)
             for line in result.stdout.strip().split('\n'):
                 if line.startswith('yes:'): 
-                    return line.split(':')[1], True
-            return "Not Connected", False
+                    ssid, signal = line[4:].rsplit(':', 1)
+                    return ssid, True, int(signal or 0)
+            return "Not Connected", False, 0
         except:
-            return "Error", False
-
-    def get_wifi_quality(self):
-        try:
-            result = subprocess.run(['nmcli', '-t', '-f', 'ACTIVE,SIGNAL', 'dev', 'wifi'], 
-                                  capture_output=True, text=True)
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith('yes:'): 
-                    return int(line.split(':')[1])
-            return 0
-        except:
-            return 0
+            return "Error", False, 0
 
     def run(self):
         while self.running:
-            ssid, connected = self.get_wifi_info()
-            quality = self.get_wifi_quality() if connected else 0
-            if ssid != self.current_ssid or connected != (self.current_quality > 0):
-                self.wifi_status_changed.emit(ssid, connected)
+            ssid, connected, quality = self.get_wifi_status()
+            if (ssid, connected, quality) != (self.current_ssid, self.current_connected, self.current_quality):
+                self.wifi_status_changed.emit(ssid, connected, quality)
                 self.current_ssid = ssid
-                self.current_quality = quality if connected else 0
+                self.current_connected = connected
+                self.current_quality = quality
             time.sleep(5)
 
     def stop(self):
@@ -112,6 +405,178 @@ class WiFiMonitor(QThread):
         self.quit()
         self.wait()
 
+
+# ===== NetworkManager D-Bus Monitor =====
+NM_SERVICE = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_DEVICE = "org.freedesktop.NetworkManager.Device"
+NM_WIRELESS = "org.freedesktop.NetworkManager.Device.Wireless"
+NM_AP = "org.freedesktop.NetworkManager.AccessPoint"
+DBUS_PROPERTIES = "org.freedesktop.DBus.Properties"
+NM_DEVICE_STATE_ACTIVATED = 100
+
+
+def dbus_value(value):
+    """Ubah tipe QtDBus jadi tipe Python biasa."""
+    if isinstance(value, QDBusVariant):
+        value = value.variant()
+    if isinstance(value, QDBusObjectPath):
+        return value.path()
+    if isinstance(value, QByteArray):
+        return bytes(value)
+    return value
+
+
+class NMDBusMonitor(QObject):
+    """Status WiFi dari signal PropertiesChanged NetworkManager.
+
+    Tidak ada fork nmcli dan tidak ada polling: device WiFi dan access point
+    aktif dipantau lewat D-Bus, signal hanya dipancarkan saat status berubah.
+    """
+    wifi_status_changed = Signal(str, bool, int)
+
+    def __init__(self, iface="wlan0", parent=None):
+        super().__init__(parent)
+        self.iface = iface
+        self.bus = QDBusConnection.systemBus()
+        self.device = None
+        self.ap = None
+        self.last_status = None
+
+    def call(self, path, interface, method, *args):
+        msg = QDBusMessage.createMethodCall(NM_SERVICE, path, interface, method)
+        msg.setArguments(list(args))
+        reply = self.bus.call(msg, QDBus.Block, 1000)
+        if reply.type() == QDBusMessage.ErrorMessage:
+            raise RuntimeError(reply.errorMessage())
+        return [dbus_value(arg) for arg in reply.arguments()]
+
+    def get(self, path, interface, prop):
+        return self.call(path, DBUS_PROPERTIES, "Get", interface, prop)[0]
+
+    def subscribe(self, path):
+        return self.bus.connect(NM_SERVICE, path, DBUS_PROPERTIES, "PropertiesChanged",
+                                self, SLOT("on_properties_changed(QDBusMessage)"))
+
+    def unsubscribe(self, path):
+        self.bus.disconnect(NM_SERVICE, path, DBUS_PROPERTIES, "PropertiesChanged",
+                            self, SLOT("on_properties_changed(QDBusMessage)"))
+
+    def start(self):
+        """True kalau NetworkManager bisa dipantau lewat D-Bus, False -> pakai nmcli."""
+        if not self.bus.isConnected():
+            print("⚠️ System D-Bus tidak tersedia")
+            return False
+        try:
+            device = self.call(NM_PATH, NM_SERVICE, "GetDeviceByIpIface", self.iface)[0]
+        except Exception as e:
+            print(f"⚠️ Device WiFi {self.iface} tidak ditemukan di NetworkManager:", e)
+            return False
+        if not isinstance(device, str) or not self.subscribe(device):
+            return False
+        self.device = device
+        print("📶 Status WiFi via D-Bus NetworkManager:", device)
+        self.refresh()
+        return True
+
+    def watch_ap(self, ap):
+        """Pindah langganan Strength ke access point aktif yang baru."""
+        if self.ap and self.ap != "/":
+            self.unsubscribe(self.ap)
+        self.ap = ap
+        if ap and ap != "/":
+            self.subscribe(ap)
+
+    @Slot(QDBusMessage)
+    def on_properties_changed(self, msg):
+        args = msg.arguments()
+        if args and args[0] in (NM_DEVICE, NM_WIRELESS, NM_AP):
+            self.refresh()
+
+    def refresh(self):
+        try:
+            state = self.get(self.device, NM_DEVICE, "State")
+            ap = self.get(self.device, NM_WIRELESS, "ActiveAccessPoint")
+            if ap != self.ap:
+                self.watch_ap(ap)
+            if state == NM_DEVICE_STATE_ACTIVATED and ap and ap != "/":
+                ssid = bytes(self.get(ap, NM_AP, "Ssid")).decode(errors="ignore")
+                status = (ssid, True, int(self.get(ap, NM_AP, "Strength")))
+            else:
+                status = ("Not Connected", False, 0)
+        except Exception as e:
+            print("⚠️ Gagal baca status WiFi dari D-Bus:", e)
+            return
+        if status != self.last_status:
+            self.last_status = status
+            self.wifi_status_changed.emit(*status)
+
+    def stop(self):
+        if self.device:
+            self.unsubscribe(self.device)
+        self.watch_ap(None)
+
+
+# ===== WiFi Scan Service =====
+class WiFiScanService(QObject):
+    """Scan jaringan WiFi di thread background dengan cache TTL.
+
+    Menu WiFi langsung dibuka dari cache; hasil scan baru dikirim lewat
+    networks_updated supaya menu yang sedang terbuka bisa diperbarui.
+    """
+    networks_updated = Signal()
+    scan_done = Signal(object, str)  # internal: hasil dari thread worker
+
+    def __init__(self, ttl=30, parent=None):
+        super().__init__(parent)
+        self.ttl = ttl
+        self.networks = []
+        self.error = ""
+        self.scanned_at = None
+        self.scanning = False
+        self.scan_done.connect(self.on_scan_done)
+
+    def is_stale(self):
+        return self.scanned_at is None or time.monotonic() - self.scanned_at > self.ttl
+
+    def scan(self, rescan=False):
+        """Mulai scan di background; abaikan kalau scan sebelumnya belum selesai."""
+        if self.scanning:
+            return
+        self.scanning = True
+        threading.Thread(target=self.worker, args=(rescan,), daemon=True).start()
+
+    def worker(self, rescan):
+        try:
+            if rescan:
+                subprocess.run(['nmcli', 'dev', 'wifi', 'rescan'], capture_output=True, timeout=10)
+            result = subprocess.run(['nmcli', '-t', '-f', 'SSID,SIGNAL,SECURITY', 'dev', 'wifi'],
+                                    capture_output=True, text=True, timeout=10)
+            best = {}
+            for line in result.stdout.strip().split('\n'):
+                parts = line.split(':')
+                if len(parts) >= 3 and parts[0]:
+                    ssid, signal, sec = parts[0], int(parts[1]), ':'.join(parts[2:])
+                    # nmcli menampilkan satu baris per BSSID, ambil sinyal terkuat
+                    if ssid not in best or signal > best[ssid][1]:
+                        best[ssid] = (ssid, signal, sec)
+            networks = sorted(best.values(), key=lambda x: x[1], reverse=True)
+            self.scan_done.emit(networks, "")
+        except Exception as e:
+            self.scan_done.emit(None, str(e))
+
+    @Slot(object, str)
+    def on_scan_done(self, networks, error):
+        self.scanning = False
+        self.error = error
+        if networks is not None:
+            self.networks = networks
+            self.scanned_at = time.monotonic()
+        else:
+            print("Error scan WiFi:", error)
+        self.networks_updated.emit()
+
+
 # ===== WiFi Indicator =====
 class WiFiIndicator(QLabel):
     def __init__(self, parent=None):
@@ -165,57 +630,692 @@ class WiFiIndicator(QLabel):
             painter.drawLine(10, 10, 30, 30)
             painter.drawLine(30, 10, 10, 30)
 
+# ===== RDM6300 Frame Decoder =====
+# Frame RDM6300: STX + 10 hex data (2 versi + 8 tag) + 2 hex checksum + ETX
+STX = 0x02
+ETX = 0x03
+FRAME_DATA_LEN = 12
+CARD_ID_LEN = 10
+LINE_MAX = 32
+
+# Tabel nilai nibble ASCII hex, 0xFF = bukan karakter hex
+HEX_VALUE = bytearray([0xFF] * 256)
+for _i, _c in enumerate(b"0123456789ABCDEF"):
+    HEX_VALUE[_c] = _i
+    HEX_VALUE[bytes([_c]).lower()[0]] = _i
+
+# seq = nomor urut di jurnal tap (diisi SerialThread sebelum dikirim ke GUI)
+CardEvent = namedtuple("CardEvent", "card_id reader source timestamp seq", defaults=(None,))
+
+
+class FrameDecoder:
+    """Decoder streaming byte serial -> CardEvent.
+
+    Menerima frame mentah RDM6300 (STX..ETX, checksum XOR divalidasi) maupun
+    baris 10 karakter hasil firmware. Frame/baris rusak atau terpotong dibuang.
+    """
+
+    def __init__(self, reader=""):
+        self.reader = reader
+        self.buf = bytearray(LINE_MAX)
+        self.length = 0
+        self.in_frame = False
+        self.overflow = False
+        self.accepted = 0
+        self.rejected = 0
+
+    def reset(self):
+        self.length = 0
+        self.in_frame = False
+        self.overflow = False
+
+    def feed(self, data):
+        """Proses potongan byte, kembalikan list CardEvent yang valid."""
+        events = []
+        buf = self.buf
+        for b in data:
+            if b == STX:
+                # STX selalu memulai frame baru, sisa data sebelumnya dibuang
+                if self.length or self.overflow:
+                    self.rejected += 1
+                self.length = 0
+                self.overflow = False
+                self.in_frame = True
+            elif self.in_frame:
+                if b == ETX:
+                    self._finish(self._check_frame(), "frame", events)
+                elif self.length < FRAME_DATA_LEN:
+                    buf[self.length] = b
+                    self.length += 1
+                else:
+                    self.overflow = True
+            elif b == 0x0A or b == 0x0D:
+                if self.length or self.overflow:
+                    self._finish(self._check_line(), "line", events)
+            elif self.length < LINE_MAX:
+                buf[self.length] = b
+                self.length += 1
+            else:
+                self.overflow = True
+        return events
+
+    def _finish(self, valid, source, events):
+        if valid:
+            card_id = self.buf[:CARD_ID_LEN].decode("ascii").upper()
+            events.append(CardEvent(card_id, self.reader, source, time.monotonic()))
+            self.accepted += 1
+        else:
+            self.rejected += 1
+        self.reset()
+
+    def _is_hex(self, n):
+        buf = self.buf
+        for i in range(n):
+            if HEX_VALUE[buf[i]] == 0xFF:
+                return False
+        return True
+
+    def _check_line(self):
+        return not self.overflow and self.length == CARD_ID_LEN and self._is_hex(CARD_ID_LEN)
+
+    def _check_frame(self):
+        if self.overflow or self.length != FRAME_DATA_LEN or not self._is_hex(FRAME_DATA_LEN):
+            return False
+        buf = self.buf
+        checksum = 0
+        for i in range(0, FRAME_DATA_LEN, 2):
+            value = (HEX_VALUE[buf[i]] << 4) | HEX_VALUE[buf[i + 1]]
+            checksum ^= value
+        # XOR 5 byte data dengan byte checksum harus 0
+        return checksum == 0
+
+# ===== Tap Dedup =====
+class TapDeduplicator:
+    """Buang tap berulang dari kartu yang sama dalam jendela waktu (LRU per ID kartu).
+
+    mode "hold"  : selama kartu masih terbaca (jeda < window) tetap ditahan,
+                   tap baru diterima setelah kartu diangkat lebih lama dari window.
+    mode "window": tap kartu yang sama diterima lagi window detik setelah tap terakhir diterima.
+    Kartu berbeda tidak saling menahan, jadi antrean siswa tetap lancar.
+    """
+
+    def __init__(self, window=3.0, mode="hold", max_cards=256):
+        if mode not in ("hold", "window"):
+            print(f"⚠️ dedup_mode={mode} tidak dikenal, pakai hold")
+            mode = "hold"
+        self.window = window
+        self.mode = mode
+        self.max_cards = max_cards
+        # card_id -> [waktu diterima, waktu terakhir terbaca, jumlah ditahan]
+        self.recent = OrderedDict()
+        self.accepted = 0
+        self.suppressed = 0
+
+    def accept(self, event):
+        """True jika tap diteruskan, False jika dianggap duplikat."""
+        now = event.timestamp
+        entry = self.recent.get(event.card_id)
+        if entry is not None:
+            since = entry[1] if self.mode == "hold" else entry[0]
+            if now - since < self.window:
+                entry[1] = now
+                entry[2] += 1
+                self.suppressed += 1
+                self.recent.move_to_end(event.card_id)
+                if entry[2] == 1:
+                    print("🔁 Tap ganda diabaikan:", event.card_id)
+                return False
+        self.recent[event.card_id] = [now, now, 0]
+        self.recent.move_to_end(event.card_id)
+        if len(self.recent) > self.max_cards:
+            self.recent.popitem(last=False)
+        self.accepted += 1
+        return True
+
+    def stats(self):
+        return {"accepted": self.accepted, "suppressed": self.suppressed}
+
+# ===== Card Registry =====
+# Satu ID per baris, "!" di depan = kartu diblokir, "#" = komentar.
+# Akhir baris CRLF ikut diterima (file diedit di Windows lalu dikirim lewat WinSCP)
+CARD_LINE = re.compile(rb"^[ \t]*(!?)[ \t]*([0-9A-Fa-f]{10})[ \t]*(?:#[^\r\n]*)?\r?$", re.M)
+# Baris berisi selain kosong/komentar, untuk mendeteksi file yang formatnya salah
+CONTENT_LINE = re.compile(rb"^[ \t]*[^#\s]", re.M)
+
+
+def pack_card_id(card_id):
+    """10 digit hex -> int 40-bit (hemat memori dan cepat di-hash dibanding string)."""
+    return int(card_id, 16)
+
+
+class CardRegistry:
+    """Daftar kartu terdaftar/diblokir dari file, dicek O(1) sebelum tap dikirim.
+
+    policy "off"   : semua kartu diteruskan (status hanya dicatat di log)
+    policy "deny"  : kartu diblokir ditolak, kartu tak dikenal tetap diteruskan
+    policy "strict": hanya kartu terdaftar yang diteruskan
+    """
+    KNOWN = "known"
+    BLOCKED = "blocked"
+    UNKNOWN = "unknown"
+    POLICIES = ("off", "deny", "strict")
+    # Jarak minimal antar cek perubahan file (detik)
+    RELOAD_CHECK = 2.0
+
+    def __init__(self, path="cards.txt", policy="deny"):
+        if policy not in self.POLICIES:
+            print(f"⚠️ card_policy={policy} tidak dikenal, pakai deny")
+            policy = "deny"
+        self.path = path
+        self.policy = policy
+        self.known = set()
+        self.blocked = set()
+        self.signature = None
+        self.next_check = 0.0
+        self.reload()
+
+    def file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def reload(self):
+        """Baca ulang file; set baru dipasang sekaligus (aman dibaca dari thread lain)."""
+        signature = self.file_signature()
+        self.signature = signature
+        known, blocked = set(), set()
+        unparsed = False
+        if signature is not None and signature[1] > 0:
+            try:
+                with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for match in CARD_LINE.finditer(data):
+                        target = blocked if match.group(1) else known
+                        target.add(int(match.group(2), 16))
+                    unparsed = not known and not blocked and CONTENT_LINE.search(data) is not None
+            except (OSError, ValueError) as e:
+                print("⚠️ Gagal baca daftar kartu:", e)
+                return False
+        # kartu yang diblokir tidak dianggap terdaftar walau ada di dua baris
+        known -= blocked
+        self.known, self.blocked = known, blocked
+        if signature is not None:
+            print(f"🪪 Daftar kartu: {len(known)} terdaftar, {len(blocked)} diblokir")
+            if unparsed:
+                print(f"⚠️ {self.path} berisi data tapi tidak ada ID kartu yang terbaca, cek formatnya "
+                      f"(10 digit hex per baris)")
+        return True
+
+    def maybe_reload(self, now):
+        """Cek perubahan file (stat) paling sering tiap RELOAD_CHECK detik."""
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.RELOAD_CHECK
+        if self.file_signature() == self.signature:
+            return False
+        return self.reload()
+
+    def lookup(self, card_id):
+        try:
+            key = pack_card_id(card_id)
+        except ValueError:
+            return self.UNKNOWN
+        if key in self.blocked:
+            return self.BLOCKED
+        if key in self.known:
+            return self.KNOWN
+        return self.UNKNOWN
+
+    def allows(self, card_id):
+        """(diteruskan?, status) untuk satu ID kartu."""
+        status = self.lookup(card_id)
+        if self.policy == "off":
+            return True, status
+        if status == self.BLOCKED:
+            return False, status
+        if self.policy == "strict" and status != self.KNOWN:
+            return False, status
+        return True, status
+
+    def stats(self):
+        return {"known": len(self.known), "blocked": len(self.blocked), "policy": self.policy}
+
+# ===== Hotplug Watcher =====
+SERIAL_BY_ID = "/dev/serial/by-id"
+
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_TO = 0x00000080
+IN_ATTRIB = 0x00000004
+
+
+class HotplugWatcher:
+    """Bangunkan selector reader saat device serial dicolok/dicabut.
+
+    Pakai pyudev (netlink) kalau terpasang, kalau tidak inotify pada /dev,
+    /dev/serial dan /dev/serial/by-id. Kalau keduanya gagal, kind = None dan
+    SerialThread kembali ke retry berkala.
+    """
+
+    WATCH_DIRS = ("/dev", "/dev/serial", SERIAL_BY_ID)
+
+    def __init__(self):
+        self.kind = None
+        self.monitor = None
+        self.fd = None
+        self.libc = None
+        try:
+            import pyudev
+            self.monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            self.monitor.filter_by(subsystem="tty")
+            self.monitor.start()
+            self.kind = "pyudev"
+            return
+        except ImportError:
+            pass
+        except Exception as e:
+            print("⚠️ pyudev gagal, pakai inotify:", e)
+        try:
+            self.libc = ctypes.CDLL(None, use_errno=True)
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1")
+            self.fd = fd
+            self.add_watches()
+            self.kind = "inotify"
+        except Exception as e:
+            print("⚠️ Hotplug tidak tersedia, pakai retry berkala:", e)
+
+    def add_watches(self):
+        # /dev/serial dan by-id baru ada setelah reader pertama dicolok, jadi dicoba ulang tiap event
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_TO | IN_ATTRIB
+        for path in self.WATCH_DIRS:
+            if os.path.isdir(path):
+                self.libc.inotify_add_watch(self.fd, path.encode(), mask)
+
+    def fileno(self):
+        return self.monitor.fileno() if self.kind == "pyudev" else self.fd
+
+    def drain(self):
+        """Buang semua event yang antre; isi event tidak penting, cukup picu scan ulang."""
+        if self.kind == "pyudev":
+            while self.monitor.poll(timeout=0) is not None:
+                pass
+            return
+        while True:
+            try:
+                if not os.read(self.fd, 4096):
+                    break
+            except BlockingIOError:
+                break
+        self.add_watches()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def usb_ids(dev_path):
+    """(vid, pid) USB dari node tty, lewat sysfs."""
+    name = os.path.basename(os.path.realpath(dev_path))
+    node = os.path.realpath(f"/sys/class/tty/{name}/device")
+    # naik dari interface USB sampai ketemu device yang punya idVendor
+    for _ in range(4):
+        try:
+            with open(os.path.join(node, "idVendor")) as f:
+                vid = f.read().strip().lower()
+            with open(os.path.join(node, "idProduct")) as f:
+                pid = f.read().strip().lower()
+            return vid, pid
+        except OSError:
+            node = os.path.dirname(node)
+    return None
+
+
+def match_device(spec, claimed=()):
+    """Cari device untuk satu entri reader.
+
+    spec bisa berupa path langsung, pola glob (mis. /dev/serial/by-id/usb-Espressif_*)
+    atau usb:VID:PID (mis. usb:303a:1001). Device yang sudah dipakai reader lain dilewati.
+    """
+    if spec.startswith("usb:"):
+        want = tuple(part.lower() for part in spec[4:].split(":", 1))
+        candidates = sorted(glob.glob(SERIAL_BY_ID + "/*"))
+        candidates = [path for path in candidates if usb_ids(path) == want]
+    elif any(ch in spec for ch in "*?["):
+        candidates = sorted(glob.glob(spec))
+    else:
+        candidates = [spec] if os.path.exists(spec) else []
+    for path in candidates:
+        if os.path.realpath(path) not in claimed:
+            return path
+    return None
+
+
+# ===== Tap Journal =====
+def read_boot_id():
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class TapJournal:
+    """Jurnal append-only tap kartu (SQLite WAL), ditulis sebelum tap dikirim ke halaman.
+
+    Semua penulisan dilakukan thread reader: tap satu kali bangun selector ditulis
+    dalam satu transaksi (group commit), konfirmasi terkirim dari thread GUI cuma
+    ditampung lalu ikut di-commit pada putaran berikutnya.
+    """
+    PENDING = 0
+    DELIVERED = 1
+    DROPPED = 2
+    SYNC_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, path="taps.db", synchronous="NORMAL", keep_days=30):
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNC_MODES:
+            # nilai ini masuk langsung ke PRAGMA, jangan teruskan isian lain
+            print(f"⚠️ journal_sync={synchronous} tidak dikenal, pakai NORMAL")
+            synchronous = "NORMAL"
+        self.lock = threading.Lock()
+        self.boot_id = read_boot_id()
+        self.marks = {}  # seq -> status, belum di-commit
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL: commit tanpa fsync (aman dari crash proses), FULL: fsync tiap commit
+        self.db.execute(f"PRAGMA synchronous={synchronous}")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS taps (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                card_id TEXT NOT NULL,
+                reader TEXT NOT NULL,
+                source TEXT NOT NULL,
+                mono REAL NOT NULL,
+                wall REAL NOT NULL,
+                boot_id TEXT NOT NULL,
+                status INTEGER NOT NULL DEFAULT 0,
+                done_at REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS taps_status ON taps(status)")
+        self.db.execute("DELETE FROM taps WHERE status != 0 AND wall < ?",
+                        (time.time() - keep_days * 86400,))
+
+    def append(self, events):
+        """Tulis satu batch tap dalam satu transaksi; kembalikan event yang sudah bernomor seq."""
+        wall = time.time()
+        out = []
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self._flush_marks()
+                for event in events:
+                    cur = self.db.execute(
+                        "INSERT INTO taps (card_id, reader, source, mono, wall, boot_id) VALUES (?, ?, ?, ?, ?, ?)",
+                        (event.card_id, event.reader, event.source, event.timestamp, wall, self.boot_id))
+                    out.append(event._replace(seq=cur.lastrowid))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return out
+
+    def mark(self, seq, status):
+        """Catat status tap (dipanggil dari thread GUI, tanpa I/O disk)."""
+        with self.lock:
+            self.marks[seq] = status
+
+    def _flush_marks(self):
+        if self.marks:
+            now = time.time()
+            self.db.executemany("UPDATE taps SET status = ?, done_at = ? WHERE seq = ?",
+                                [(status, now, seq) for seq, status in self.marks.items()])
+            self.marks.clear()
+
+    def flush(self):
+        """Commit status yang tertampung (dipanggil thread reader tiap putaran)."""
+        with self.lock:
+            if not self.marks:
+                return
+            self.db.execute("BEGIN")
+            self._flush_marks()
+            self.db.execute("COMMIT")
+
+    def pending(self, max_age):
+        """Tap yang belum terkirim. Tap lebih tua dari max_age detik ditandai DROPPED."""
+        cutoff = time.time() - max_age
+        now_mono = time.monotonic()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT seq, card_id, reader, mono, wall, boot_id FROM taps WHERE status = 0 ORDER BY seq"
+            ).fetchall()
+            events = []
+            for seq, card_id, reader, mono, wall, boot_id in rows:
+                if seq in self.marks:
+                    continue
+                if wall < cutoff:
+                    # terlalu lama untuk dikirim ulang (bisa jadi pembayaran salah)
+                    self.marks[seq] = self.DROPPED
+                    continue
+                # monotonic hanya berlaku di boot yang sama
+                timestamp = mono if boot_id == self.boot_id else now_mono
+                events.append(CardEvent(card_id, reader, "journal", timestamp, seq))
+        return events
+
+    def close(self):
+        with self.lock:
+            if self.marks:
+                self.db.execute("BEGIN")
+                self._flush_marks()
+                self.db.execute("COMMIT")
+            self.db.close()
+
+
 # ===== Serial Thread =====
-class SerialThread(QThread):
-    data_received = Signal(str)
+def reader_ports():
+    """Daftar reader dari kiosk.txt (reader1=..., reader2=...), default satu PORT."""
+    ports = [(key, value) for key, value in CONFIG.items()
+             if key.startswith("reader") and key[6:].isdigit() and value]
+    ports.sort(key=lambda item: int(item[0][6:]))
+    return ports or [("reader1", PORT)]
 
-    def __init__(self, port, baud):
-        super().__init__()
-        self.port = port
+
+class ReaderPort:
+    """Satu reader serial: pola device, koneksi, dan decoder sendiri."""
+
+    def __init__(self, name, spec, baud):
+        self.name = name
+        self.spec = spec
+        self.path = None
         self.baud = baud
         self.ser = None
+        self.decoder = FrameDecoder(name)
+        self.retry_at = 0.0
+        self.waiting = False
+
+
+class SerialThread(QThread):
+    """Satu thread + satu selector untuk semua reader serial dan event hotplug."""
+    data_received = Signal(object)  # CardEvent
+
+    # Batas tunggu selector; hanya untuk cek flag running / jadwal retry
+    SELECT_TIMEOUT = 0.5
+    # Retry berkala hanya dipakai kalau hotplug tidak tersedia
+    RETRY_INTERVAL = 2.0
+    # Node baru muncul tapi belum bisa dibuka (udev masih set permission)
+    HOTPLUG_RETRY = 0.2
+
+    def __init__(self, ports, baud, journal=None):
+        super().__init__()
+        self.readers = [ReaderPort(name, spec, baud) for name, spec in ports]
+        self.journal = journal
+        self.seq = 0  # nomor tap kalau jurnal tidak dipakai
         self.running = True
+        self.selector = selectors.DefaultSelector()
+        self.read_buf = bytearray(256)
+        self.dedup = TapDeduplicator(cfg("dedup_window", 3.0), cfg("dedup_mode", "hold"))
+        self.registry = CardRegistry(cfg("cards", "cards.txt"), cfg("card_policy", "deny"))
+        self.rejected = 0
+        self.hotplug = HotplugWatcher()
+        if self.hotplug.kind:
+            self.selector.register(self.hotplug.fileno(), selectors.EVENT_READ, self.hotplug)
+            print("🔌 Hotplug reader via", self.hotplug.kind)
+
+    def connect_serial(self, reader, path):
+        """Buka satu reader; kalau gagal dijadwalkan ulang tanpa memblok reader lain."""
+        import serial  # di thread reader, bukan saat startup
+        try:
+            # timeout=0 -> read() non-blocking, penantian data diserahkan ke selector
+            reader.ser = serial.Serial(path, reader.baud, timeout=0)
+            self.selector.register(reader.ser.fileno(), selectors.EVENT_READ, reader)
+            reader.path = path
+            reader.waiting = False
+            reader.decoder.reset()
+            print(f"✅ Terkoneksi ke {reader.name}:", path)
+        except Exception as e:
+            reader.ser = None
+            retry = self.HOTPLUG_RETRY if self.hotplug.kind else self.RETRY_INTERVAL
+            reader.retry_at = time.monotonic() + retry
+            print(f"⚠️ Gagal buka {reader.name}, retry...", e)
+
+    def connect_pending(self):
+        now = time.monotonic()
+        claimed = {os.path.realpath(r.path) for r in self.readers if r.ser is not None}
+        for reader in self.readers:
+            if reader.ser is not None or now < reader.retry_at:
+                continue
+            path = match_device(reader.spec, claimed)
+            if path is None:
+                if not reader.waiting:
+                    print(f"⏳ Menunggu {reader.name} dicolok:", reader.spec)
+                    reader.waiting = True
+                if not self.hotplug.kind:
+                    reader.retry_at = now + self.RETRY_INTERVAL
+                continue
+            self.connect_serial(reader, path)
+            if reader.ser is not None:
+                claimed.add(os.path.realpath(path))
+
+    def pending_timeout(self):
+        """Timeout selector: tidur panjang kecuali ada reader yang terjadwal retry."""
+        now = time.monotonic()
+        timeout = self.SELECT_TIMEOUT
+        for reader in self.readers:
+            if reader.ser is None and reader.retry_at > now:
+                timeout = min(timeout, reader.retry_at - now)
+        return timeout
+
+    def close_serial(self, reader):
+        if reader.ser is None:
+            return
+        try:
+            self.selector.unregister(reader.ser.fileno())
+        except Exception:
+            pass
+        try:
+            reader.ser.close()
+        except:
+            pass
+        reader.ser = None
+        reader.retry_at = 0.0 if self.hotplug.kind else time.monotonic() + self.RETRY_INTERVAL
 
-    def connect_serial(self):
-        """Coba konek ke port serial sampai berhasil."""
-        while self.running:
+    def read_available(self, reader, batch):
+        """Baca byte yang siap ke buffer tetap lalu decode jadi CardEvent."""
+        try:
+            n = os.readv(reader.ser.fileno(), [self.read_buf])
+        except BlockingIOError:
+            return
+        if n == 0:
+            # fd siap tapi tidak ada data -> device dicabut
+            raise EOFError("port tertutup")
+        for event in reader.decoder.feed(memoryview(self.read_buf)[:n]):
+            # Dedup dipakai bersama: kartu yang sama di reader lain tetap dianggap ganda
+            if not self.dedup.accept(event):
+                continue
+            allowed, status = self.registry.allows(event.card_id)
+            if not allowed:
+                self.rejected += 1
+                print(f"⛔ Kartu {status} ditolak ({event.reader}):", event.card_id)
+                continue
+            batch.append(event)
+
+    def publish(self, batch):
+        """Catat batch ke jurnal (satu commit) lalu kirim ke GUI."""
+        if self.journal:
             try:
-                self.ser = serial.Serial(self.port, self.baud, timeout=1)
-                print("✅ Terkoneksi ke", self.port)
-                return
+                batch = self.journal.append(batch)
             except Exception as e:
-                print("⚠️ Gagal buka port, retry 2 detik...", e)
-                time.sleep(2)
+                print("⚠️ Gagal tulis jurnal tap:", e)
+        for event in batch:
+            if event.seq is None:
+                self.seq -= 1  # negatif = tidak ada di jurnal
+                event = event._replace(seq=self.seq)
+            self.data_received.emit(event)
 
     def run(self):
-        self.connect_serial()
         while self.running:
-            try:
-                if self.ser and self.ser.in_waiting > 0:
-                    rfid_data = self.ser.readline().decode(errors="ignore").strip()
-                    if rfid_data:
-                        self.data_received.emit(rfid_data)
-            except Exception as e:
-                print("⚠️ Serial error, reconnect:", e)
+            self.connect_pending()
+            self.registry.maybe_reload(time.monotonic())
+            # Tidur di kernel sampai ada data serial atau event hotplug (CPU ~0% saat idle)
+            batch = []
+            for key, _ in self.selector.select(self.pending_timeout()):
+                if key.data is self.hotplug:
+                    self.hotplug.drain()
+                    continue
+                reader = key.data
                 try:
-                    self.ser.close()
-                except:
-                    pass
-                time.sleep(2)
-                self.connect_serial()
+                    self.read_available(reader, batch)
+                except Exception as e:
+                    if not self.running:
+                        break
+                    print(f"⚠️ Serial error {reader.name}, tunggu dicolok ulang:", e)
+                    self.close_serial(reader)
+            if batch:
+                self.publish(batch)
+            elif self.journal:
+                self.journal.flush()
+        for reader in self.readers:
+            self.close_serial(reader)
 
     def stop(self):
         self.running = False
-        if self.ser:
-            self.ser.close()
         self.quit()
         self.wait()
+        self.selector.close()
+        self.hotplug.close()
 
 # ===== Bridge for WebChannel =====
-class Bridge(QObject):
-    def __init__(self, parent=None):
+class TapBridge(QObject):
+    """Objek "kiosk" di channel halaman pemesanan: hanya tap dan fokus.
+
+    Halaman pemesanan adalah situs luar, jadi slot admin (setting, URL, password,
+    WiFi) tidak pernah diekspos ke sana.
+    """
+    # Push ID kartu langsung ke window.__kiosk di halaman
+    cardTapped = Signal(int, str, str)  # seq, card_id, reader
+
+    def __init__(self, parent=None, view=None):
         super().__init__()
         self.parent = parent
+        self.view = view  # view pemilik channel ini (halaman pemesanan / admin)
+
+    @Slot(int, bool)
+    def tapResult(self, seq, ok):
+        """Konfirmasi dari kiosk script: tap seq berhasil/gagal dimasukkan ke halaman"""
+        self.parent.on_tap_result(seq, ok)
+
+    @Slot(bool)
+    def focusChanged(self, focused):
+        """Dipanggil kiosk script saat input di halaman mendapat/kehilangan fokus"""
+        self.parent.handle_focus_change(focused, self.view)
+
+
+class Bridge(TapBridge):
+    """Objek "pywebchannel" untuk halaman admin lokal (login/setting/WiFi) saja."""
 
     @Slot(str)
     def sendWifiPassword(self, pwd):
@@ -226,19 +1326,8 @@ class Bridge(QObject):
 
     @Slot()
     def goHome(self):
-        self.parent.keyboard_widget.setVisible(False)
-
-        try:
-            # baca URL dari file txt
-            with open("urlx.txt", "r") as f:
-                url = f.read().strip()   # hapus spasi/enter
-        except Exception as e:
-            print("❌ Gagal baca file URL:", e)
-            # fallback ke default
-            url = "https://pesatkantin.com/order-self"
-
-        # set URL ke browser
-        self.parent.browser.setUrl(QUrl(url))
+        # Halaman pemesanan masih hidup di belakang, cukup ditampilkan lagi tanpa dimuat ulang
+        self.parent.show_ordering_page()
         
     @Slot(str)
     def saveUrl(self, url):
@@ -246,6 +1335,7 @@ class Bridge(QObject):
             with open("urlx.txt", "w") as f:
                 f.write(url.strip())
             print(f"✅ URL tersimpan: {url}")
+            self.parent.show_ordering_page()
             self.parent.browser.setUrl(QUrl(url.strip()))
             # Update title label sementara
             self.parent.title_label.setText("Loading...")
@@ -263,24 +1353,1087 @@ class Bridge(QObject):
             print("❌ Gagal baca login.txt:", e)
             return False
 
+    @Slot(result=str)
+    def currentUrl(self):
+        """URL halaman pemesanan untuk halaman setting"""
+        return self.parent.start_url()
+
+    @Slot(result=str)
+    def currentSsid(self):
+        """SSID yang dipilih dari menu WiFi untuk halaman password WiFi"""
+        return self.parent.current_ssid
+
     @Slot()
     def showSettingPage(self):
         """Tampilkan halaman setting setelah login berhasil"""
         self.parent.open_setting_html()
 
 
+# ===== Kiosk Script (disuntik ke setiap halaman) =====
+# Satu QWebChannel per dokumen. Halaman pemesanan hanya mendapat objek "kiosk" (TapBridge);
+# window.pywebchannel hanya diisi di halaman admin, yang channel-nya memuat Bridge.
+KIOSK_JS = """
+(function () {
+    if (window.__kiosk) return;
+    var kiosk = window.__kiosk = { bridge: null };
+
+    function isInput(f) {
+        return f && (f.tagName === 'INPUT' || f.tagName === 'TEXTAREA');
+    }
+
+    // Isi field yang sedang fokus dengan ID kartu lalu submit, seperti ketik + Enter.
+    // Event 'kiosk-tap' membawa nama reader untuk halaman yang melayani beberapa antrean.
+    // Enter sintetis tidak men-submit form, jadi submit implisit dilakukan lewat requestSubmit()
+    // (validasi + handler submit jalan seperti Enter asli), kecuali keydown di-preventDefault.
+    // Hasil per tap: true = masuk, false = ditolak, null = tidak dicoba karena tap sebelumnya
+    // sudah di-submit (sisa batch dikembalikan ke antrean, dikirim setelah halaman siap lagi).
+    kiosk.tap = function (taps) {
+        var results = [];
+        var f = document.activeElement;
+        for (var i = 0; i < taps.length; i++) {
+            if (!isInput(f)) {
+                results.push(false);
+                continue;
+            }
+            document.dispatchEvent(new CustomEvent('kiosk-tap', {detail: taps[i]}));
+            f.value = taps[i].id;
+            f.dispatchEvent(new Event('input', {bubbles: true}));
+            f.dispatchEvent(new Event('change', {bubbles: true}));
+            var opt = {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true, cancelable: true};
+            var submit = f.dispatchEvent(new KeyboardEvent('keydown', opt));
+            f.dispatchEvent(new KeyboardEvent('keyup', opt));
+            var form = f.form;
+            var ok = true;
+            if (form && submit) {
+                // form tidak valid: requestSubmit hanya menampilkan pesan validasi, tap gagal
+                ok = form.checkValidity();
+                try {
+                    form.requestSubmit();
+                } catch (e) {
+                    ok = false;
+                }
+            }
+            results.push(ok);
+            // Enter yang diterima halaman = submit; tap berikutnya akan menimpa field
+            if (ok) break;
+        }
+        while (results.length < taps.length) results.push(null);
+        return results;
+    };
+
+    // Keyboard virtual: satu panggilan untuk semua tombol dalam satu frame, urutan dijaga.
+    // '\\b' = Backspace, '\\n' = Enter, selain itu karakter biasa.
+    function keyEvent(type, key, code) {
+        return new KeyboardEvent(type, {key: key, code: key, keyCode: code, which: code, bubbles: true});
+    }
+    kiosk.type = function (keys) {
+        var f = document.activeElement;
+        if (!isInput(f)) return;
+        for (var i = 0; i < keys.length; i++) {
+            var k = keys[i];
+            if (k === '\\n') {
+                f.dispatchEvent(keyEvent('keydown', 'Enter', 13));
+                f.dispatchEvent(keyEvent('keyup', 'Enter', 13));
+            } else if (k === '\\b') {
+                f.value = f.value.slice(0, -1);
+                f.dispatchEvent(new Event('input', {bubbles: true}));
+                f.dispatchEvent(keyEvent('keyup', 'Backspace', 8));
+            } else if (k === ' ') {
+                f.value += ' ';
+                f.dispatchEvent(new Event('input', {bubbles: true}));
+            } else {
+                f.value += k;
+                f.dispatchEvent(new Event('input', {bubbles: true}));
+                f.dispatchEvent(keyEvent('keydown', k, k.charCodeAt(0)));
+                f.dispatchEvent(keyEvent('keyup', k, k.charCodeAt(0)));
+            }
+        }
+    };
+
+    // Lapor ke Python hanya saat status fokus input berubah (pengganti polling 500 ms)
+    kiosk.inputFocused = null;
+    function notifyFocus() {
+        var focused = isInput(document.activeElement);
+        if (!kiosk.bridge || focused === kiosk.inputFocused) return;
+        kiosk.inputFocused = focused;
+        kiosk.bridge.focusChanged(focused);
+    }
+    // Status fokus saat ini, untuk Python yang tidak bisa menunggu laporan perubahan
+    // (mis. loadStarted tanpa dokumen baru: inputFocused tidak berubah, tidak ada laporan)
+    kiosk.hasFocus = function () {
+        kiosk.inputFocused = isInput(document.activeElement);
+        return kiosk.inputFocused;
+    };
+    document.addEventListener('focusin', notifyFocus, true);
+    // activeElement baru terisi setelah focusout selesai diproses
+    document.addEventListener('focusout', function () { setTimeout(notifyFocus, 0); }, true);
+
+    if (window.qt && qt.webChannelTransport) {
+        new QWebChannel(qt.webChannelTransport, function (channel) {
+            // Bridge admin sekaligus TapBridge, jadi cukup satu objek di channel admin
+            kiosk.bridge = channel.objects.kiosk || channel.objects.pywebchannel;
+            if (channel.objects.pywebchannel) window.pywebchannel = channel.objects.pywebchannel;
+            kiosk.bridge.cardTapped.connect(function (seq, id, reader) {
+                var ok = kiosk.tap([{seq: seq, id: id, reader: reader}])[0];
+                kiosk.bridge.tapResult(seq, ok === true);
+            });
+            notifyFocus();
+            // halaman admin mengambil datanya setelah channel siap
+            document.dispatchEvent(new CustomEvent('kiosk-ready'));
+        });
+    }
+})();
+"""
+
+
+def load_qwebchannel_js():
+    """Ambil source qwebchannel.js dari resource Qt."""
+    f = QFile(":/qtwebchannel/qwebchannel.js")
+    if not f.open(QIODevice.ReadOnly):
+        print("⚠️ qwebchannel.js tidak ditemukan di resource Qt")
+        return ""
+    try:
+        return bytes(f.readAll()).decode("utf-8")
+    finally:
+        f.close()
+
+
+# ===== Card Delivery =====
+class CardDelivery:
+    """Dasar strategi pengiriman ID kartu ke halaman web."""
+    name = ""
+
+    def __init__(self, window):
+        self.window = window
+
+    def deliver(self, event):
+        raise NotImplementedError
+
+
+class WebChannelDelivery(CardDelivery):
+    """Jalur cepat: emit signal Bridge, halaman menerima lewat QWebChannel (satu hop IPC)."""
+    name = "webchannel"
+
+    def deliver(self, event):
+        # hasil dikonfirmasi balik lewat Bridge.tapResult
+        self.window.bridge.cardTapped.emit(event.seq, event.card_id, event.reader)
+
+
+class JavaScriptDelivery(CardDelivery):
+    """Tap dalam satu giliran event loop digabung jadi satu panggilan runJavaScript."""
+    name = "javascript"
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.pending = []
+
+    def deliver(self, event):
+        self.pending.append({"seq": event.seq, "id": event.card_id, "reader": event.reader})
+        if len(self.pending) == 1:
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        taps, self.pending = self.pending, []
+        if not taps:
+            return
+
+        def done(results):
+            if not isinstance(results, list):
+                results = [False] * len(taps)  # kiosk script belum ada di halaman
+            # dari belakang: tap yang dikembalikan ke depan antrean tetap berurutan
+            for tap, ok in reversed(list(zip(taps, results))):
+                if ok is None:
+                    # tidak dicoba karena tap sebelumnya sudah submit
+                    self.window.on_tap_result(tap["seq"], False, attempted=False)
+                else:
+                    self.window.on_tap_result(tap["seq"], bool(ok))
+
+        self.window.browser.page().runJavaScript(
+            "window.__kiosk ? window.__kiosk.tap(%s) : null;" % json.dumps(taps), done
+        )
+
+
+class PyAutoGuiDelivery(CardDelivery):
+    """Mode lama: ketik ID lewat keystroke X11 (memblok thread GUI ±150 ms per tap)."""
+    name = "pyautogui"
+
+    def __init__(self, window):
+        super().__init__(window)
+        # pyautogui menarik Xlib, pymsgbox, pyscreeze/PIL; hanya di-load kalau mode ini dipilih
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def deliver(self, event):
+        try:
+            self.window.browser.activateWindow()
+            self.window.browser.setFocus()
+            time.sleep(0.1)
+
+            self.pyautogui.typewrite(event.card_id)
+            time.sleep(0.05)
+            self.pyautogui.press("enter")
+            print("✅ RFID berhasil diinput")
+            self.window.on_tap_result(event.seq, True)
+
+        except Exception as e:
+            print("❌ Error:", e)
+            # Fallback ke JavaScript
+            JavaScriptDelivery(self.window).deliver(event)
+
+
+DELIVERY_BACKENDS = {
+    backend.name: backend
+    for backend in (WebChannelDelivery, JavaScriptDelivery, PyAutoGuiDelivery)
+}
+
+
+def make_delivery(window):
+    """Pilih backend pengiriman dari kiosk.txt (delivery=...)."""
+    name = cfg("delivery", "webchannel")
+    backend = DELIVERY_BACKENDS.get(name)
+    if backend is None:
+        print(f"⚠️ delivery={name} tidak dikenal, pakai webchannel")
+        backend = WebChannelDelivery
+    try:
+        delivery = backend(window)
+    except ImportError as e:
+        print(f"⚠️ delivery={backend.name} tidak bisa dipakai ({e}), pakai webchannel")
+        delivery = WebChannelDelivery(window)
+    print("📦 Mode kirim RFID:", delivery.name)
+    return delivery
+
+
+# ===== Tap Queue =====
+class TapQueue(QObject):
+    """Antrean tap menuju halaman pemesanan, sadar kesiapan halaman.
+
+    Tap ditahan selama halaman masih dimuat, belum ada input yang fokus, atau
+    halaman admin sedang tampil, lalu dikirim satu per satu begitu halaman siap.
+    Tap berikutnya baru dikirim setelah tap sebelumnya dikonfirmasi halaman dan
+    siklus muat ulang sesudah submit selesai (atau halaman diam SETTLE_MS tanpa
+    mulai memuat), supaya tidak masuk ke dokumen yang sedang ditinggalkan.
+    Kedalaman dibatasi: policy "oldest" membuang tap tertua saat penuh, "newest"
+    menolak tap baru. Tap yang menunggu lebih dari max_wait detik dibuang.
+    Nomor seq jurnal dipakai supaya tap yang sama tidak pernah masuk dua kali.
+    """
+    # Percobaan kirim ulang kalau halaman menolak tap (input hilang di tengah jalan)
+    MAX_ATTEMPTS = 3
+    RETRY_MS = 250
+    # Jeda tenang setelah tap diterima; kalau halaman tidak mulai memuat, tap berikutnya dikirim
+    SETTLE_MS = 300
+    # Tap terkirim tanpa konfirmasi (mis. halaman pindah) dibuang setelah sekian detik
+    IN_FLIGHT_TIMEOUT = 5.0
+    WAIT_SAMPLES = 512
+
+    def __init__(self, window, max_depth=8, max_wait=20.0, policy="oldest", wait_input=True):
+        super().__init__(window)
+        if policy not in ("oldest", "newest"):
+            print(f"⚠️ tap_queue_policy={policy} tidak dikenal, pakai oldest")
+            policy = "oldest"
+        self.window = window
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+        self.policy = policy
+        self.wait_input = wait_input
+        # entry: [event, read_at, queued_at, attempts]
+        self.queue = deque()
+        self.in_flight = {}  # seq -> entry, menunggu konfirmasi halaman (paling banyak satu)
+        # Setelah tap diterima: tunggu loadStarted atau jeda tenang sebelum tap berikutnya
+        self.settling = False
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(self.SETTLE_MS)
+        self.settle_timer.timeout.connect(self.settled)
+        self.loading = True
+        self.input_ready = not wait_input
+        self.generation = 0  # naik tiap loadStarted, jawaban probe fokus yang basi diabaikan
+        # Cek kedaluwarsa hanya berjalan selama ada tap yang menunggu
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.expire)
+        # metrik
+        self.wait_ms = deque(maxlen=self.WAIT_SAMPLES)
+        self.max_seen = 0
+        self.dropped = 0
+        self.expired = 0
+
+    def __contains__(self, seq):
+        return seq in self.in_flight or any(entry[0].seq == seq for entry in self.queue)
+
+    def ready(self):
+        window = self.window
+        # salinan offline tidak bisa memproses pesanan: tap tetap ditahan
+        return (not self.loading and self.input_ready and not self.in_flight
+                and not self.settling and not window.offline_shell
+                and window.active_view() is window.browser)
+
+    # --- siklus halaman ---
+    def page_load_started(self):
+        self.loading = True
+        self.generation += 1
+        # submit tap terakhir memicu muat ulang: sekarang loadFinished yang menahan antrean
+        self.settling = False
+        self.settle_timer.stop()
+        if self.wait_input:
+            # dokumen baru: tunggu kiosk script melaporkan input yang fokus
+            self.input_ready = False
+
+    def page_load_finished(self, success):
+        self.loading = False
+        self.drain()
+        # loadStarted tanpa dokumen baru tidak memicu laporan fokus: tanya langsung
+        self.probe_focus()
+
+    def settled(self):
+        """Halaman diam setelah tap diterima (tidak ada muat ulang): lanjut tap berikutnya."""
+        self.settling = False
+        self.drain()
+
+    def set_input_ready(self, ready):
+        self.input_ready = ready or not self.wait_input
+        self.drain()
+
+    def probe_focus(self):
+        """Tanya halaman apakah sekarang ada input yang fokus (runJavaScript, tidak memblokir)."""
+        if not self.wait_input:
+            return
+        generation = self.generation
+
+        def done(focused):
+            if generation == self.generation:
+                self.set_input_ready(bool(focused))
+
+        self.window.browser.page().runJavaScript("!!(window.__kiosk && window.__kiosk.hasFocus())", done)
+
+    # --- antrean ---
+    def push(self, event, read_at):
+        """Masukkan tap; False kalau duplikat atau ditolak karena antrean penuh."""
+        if event.seq in self:
+            return False
+        entry = [event, read_at, time.monotonic(), 0]
+        if len(self.queue) >= self.max_depth:
+            if self.policy == "newest":
+                self.drop(entry, "antrean penuh")
+                return False
+            self.drop(self.queue.popleft(), "antrean penuh")
+        self.queue.append(entry)
+        self.max_seen = max(self.max_seen, len(self.queue))
+        self.drain()
+        if self.queue:
+            print(f"⏸️ Tap ditahan, halaman belum siap ({len(self.queue)} antre):", event.card_id)
+            if not self.loading and not self.input_ready:
+                # status fokus bisa basi (laporan terlewat), cek ulang ke halaman
+                self.probe_focus()
+        return True
+
+    def drain(self):
+        # satu tap per panggilan; tap berikutnya dipicu result() -> settled()/loadFinished
+        if self.queue and self.ready():
+            entry = self.queue.popleft()
+            now = time.monotonic()
+            if entry[3] == 0:
+                self.wait_ms.append((now - entry[2]) * 1000)
+            entry[3] += 1
+            self.in_flight[entry[0].seq] = entry
+            entry[2] = now  # mulai hitung timeout konfirmasi
+            self.window.delivery.deliver(entry[0])
+        if self.queue or self.in_flight:
+            if not self.timer.isActive():
+                self.timer.start()
+        else:
+            self.timer.stop()
+
+    def result(self, seq, ok, attempted=True):
+        """Konfirmasi dari halaman; kembalikan read_at tap (None kalau tidak dikenal).
+
+        attempted=False: halaman tidak mencoba tap ini (batch berhenti di submit sebelumnya),
+        dikembalikan ke antrean tanpa menghabiskan jatah percobaan.
+        """
+        entry = self.in_flight.pop(seq, None)
+        if entry is None:
+            return None
+        if not attempted:
+            entry[3] -= 1
+        if not ok:
+            if entry[3] < self.MAX_ATTEMPTS:
+                # taruh di depan supaya urutan tap tetap
+                self.queue.appendleft(entry)
+                QTimer.singleShot(self.RETRY_MS, self.drain)
+            else:
+                # ditolak halaman: jangan sampai masuk ke pesanan pelanggan berikutnya
+                self.drop(entry, "ditolak halaman")
+        else:
+            self.settling = True
+            self.settle_timer.start()
+        return entry[1]
+
+    def expire(self):
+        now = time.monotonic()
+        while self.queue and now - self.queue[0][2] > self.max_wait:
+            self.expired += 1
+            entry = self.queue.popleft()
+            if self.window.offline_shell:
+                # tetap PENDING di jurnal, dikirim ulang saat halaman asli kembali
+                print("📴 Tap kedaluwarsa selama offline, tetap di jurnal:", entry[0].card_id)
+                continue
+            self.drop(entry, f"menunggu > {self.max_wait:.0f} dtk", count=False)
+        for seq, entry in list(self.in_flight.items()):
+            if now - entry[2] > self.IN_FLIGHT_TIMEOUT:
+                del self.in_flight[seq]
+                # tidak diketahui masuk atau tidak: jangan dikirim ulang saat replay
+                self.drop(entry, "tanpa konfirmasi halaman")
+        self.drain()
+
+    def drop(self, entry, reason, count=True):
+        if count:
+            self.dropped += 1
+        event = entry[0]
+        print(f"🗑️ Tap dibuang ({reason}):", event.card_id)
+        journal = self.window.journal
+        if journal and event.seq > 0:
+            journal.mark(event.seq, TapJournal.DROPPED)
+
+    def stats(self):
+        p50, p99 = KioskStats.percentiles(self.wait_ms, (50, 99))
+        return {"depth": len(self.queue), "max_depth": self.max_seen, "wait_p50": p50,
+                "wait_p99": p99, "dropped": self.dropped, "expired": self.expired}
+
+
+# ===== Keyboard Style =====
+SYMBOL_KEYS = {"@", "#", "%", "&", "*", "(", ")", "-", "_", "+", "=", "<", ">", "?", "/"}
+
+# Satu stylesheet aplikasi untuk semua tombol keyboard, dibedakan property "role"
+KEYBOARD_QSS = """
+QWidget#keyboardContainer {
+    background-color: #f0f0f0;
+    border-radius: 10px;
+    padding: 5px;
+}
+QPushButton[role="key"], QPushButton[role="symbol"] {
+    font-size: 18px;
+    background-color: white;
+    border: 2px solid #d0d0d0;
+    border-radius: 5px;
+    padding: 5px;
+}
+QPushButton[role="symbol"] {
+    font-size: 14px;
+}
+QPushButton[role="key"]:pressed, QPushButton[role="symbol"]:pressed {
+    background-color: #e0e0e0;
+}
+QPushButton[role="caps"] {
+    font-size: 16px;
+    font-weight: bold;
+    background-color: #d0d0d0;
+    border: 2px solid #b0b0b0;
+    border-radius: 5px;
+    padding: 5px;
+}
+QPushButton[role="caps"][caps="true"] {
+    background-color: #ADD8E6;
+}
+QPushButton[role="caps"]:pressed {
+    background-color: #a0a0a0;
+}
+QPushButton[role="fn"] {
+    font-size: 16px;
+    font-weight: bold;
+    background-color: #4a86e8;
+    color: white;
+    border: 2px solid #3a76d8;
+    border-radius: 5px;
+    padding: 5px;
+}
+QPushButton[role="fn"]:pressed {
+    background-color: #3a76d8;
+}
+QPushButton[role="backspace"] {
+    font-size: 20px;
+    font-weight: bold;
+    background-color: #ff6b6b;
+    color: white;
+    border: 2px solid #e55b5b;
+    border-radius: 5px;
+    padding: 5px;
+}
+QPushButton[role="backspace"]:pressed {
+    background-color: #e55b5b;
+}
+"""
+
+
+class KeyButton(QPushButton):
+    """Tombol keyboard virtual; tampilan dari KEYBOARD_QSS lewat property role."""
+
+    def __init__(self, key, role, parent=None):
+        super().__init__(key, parent)
+        self.key = key
+        self.setProperty("role", role)
+        self.setFixedHeight(50)
+
+
+# ===== Startup Profiler =====
+class StartupProfiler:
+    """Catat waktu tiap tahap boot; laporan dicetak kalau dijalankan dengan --profile-startup."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.last = BOOT_T0
+        self.marks = []
+        self.done = False
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        delta, total = now - self.last, now - BOOT_T0
+        self.marks.append((stage, delta, total))
+        self.last = now
+        if self.enabled:
+            print(f"⏱️ {stage}: +{delta * 1000:.0f} ms (total {total * 1000:.0f} ms)")
+
+    def finish(self, stage="siap"):
+        """Tandai boot selesai (sekali saja) dan cetak ringkasan."""
+        if self.done:
+            return
+        self.mark(stage)
+        self.done = True
+        if self.enabled:
+            print("⏱️ ===== Profil startup =====")
+            for name, delta, total in self.marks:
+                print(f"⏱️ {name:<24} {delta * 1000:8.1f} ms   (total {total * 1000:8.1f} ms)")
+
+
+# ===== Web Profile =====
+# Ringkasan Resource Timing halaman: transferSize 0 + decodedBodySize > 0 = diambil dari cache.
+# Resource lintas origin tanpa Timing-Allow-Origin melaporkan 0 semua -> "tidak diketahui".
+CACHE_REPORT_JS = """
+(function () {
+    var r = {total: 0, cached: 0, network: 0, unknown: 0, cachedBytes: 0, networkBytes: 0};
+    performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+        .forEach(function (e) {
+            r.total++;
+            if (e.transferSize > 0) { r.network++; r.networkBytes += e.transferSize; }
+            else if (e.decodedBodySize > 0) { r.cached++; r.cachedBytes += e.decodedBodySize; }
+            else r.unknown++;
+        });
+    return JSON.stringify(r);
+})();
+"""
+
+
+def dir_size(path):
+    """(jumlah file, total byte) isi folder cache."""
+    files = size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+                files += 1
+            except OSError:
+                pass
+    return files, size
+
+
+def make_web_profile():
+    """Profil WebEngine bernama dan persisten supaya cache HTTP/cookie bertahan setelah reboot.
+
+    web_profile=off = profil bawaan Qt (perilaku lama).
+    """
+    from PySide6.QtWebEngineCore import QWebEngineProfile
+    name = cfg("web_profile", "kiosk")
+    if name == "off":
+        return None
+    # Induk QApplication: profil harus hidup lebih lama dari halaman yang memakainya
+    profile = QWebEngineProfile(name, QApplication.instance())
+    storage = cfg("web_storage", "")
+    if storage:
+        profile.setPersistentStoragePath(storage)
+    cache = cfg("web_cache", "")
+    if cache:
+        # contoh: /dev/shm/kiosk-cache (tmpfs, cepat tapi hilang saat reboot) atau folder di SD
+        os.makedirs(cache, exist_ok=True)
+        profile.setCachePath(cache)
+    profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(cfg("web_cache_mb", 200) * 1024 * 1024)
+
+    cache_path = profile.cachePath()
+
+    def report():
+        # menelusuri cache (sampai web_cache_mb) di thread lain, tidak menunda boot WebEngine
+        files, size = dir_size(cache_path)
+        state = "hangat" if files else "dingin"
+        print(f"🗄️ Profil web '{name}': cache {state}, {files} file / {size / 1048576:.1f} MB di {cache_path}")
+
+    threading.Thread(target=report, daemon=True).start()
+    return profile
+
+
+# ===== Asset Mirror =====
+def read_manifest(path):
+    """URL precache, satu per baris ('#' = komentar)."""
+    try:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except FileNotFoundError:
+        return []
+
+
+class AssetMirror:
+    """Mirror lokal asset statis situs pemesanan: http://<scheme>-<port>.<host>.localhost:PORT/<path>.
+
+    Asal (origin) asset disimpan di nama host, bukan di path, supaya url(/fonts/a.woff)
+    di dalam CSS yang di-mirror tetap menuju host asal. *.localhost selalu ke loopback.
+    Asset yang sudah tersimpan langsung dilayani dari disk; kalau umurnya lewat max_age
+    diperbarui di belakang (stale-while-revalidate), jadi putus WiFi sebentar tidak
+    membuat halaman rusak. Dokumen halaman awal ikut disimpan sebagai "shell" offline.
+    Isi folder dibatasi max_bytes: asset yang paling lama tidak dipakai dibuang dulu.
+    """
+    # Jenis request yang dialihkan ke mirror (nama enum QWebEngineUrlRequestInfo)
+    RESOURCE_TYPES = (
+        "ResourceTypeStylesheet", "ResourceTypeScript", "ResourceTypeImage",
+        "ResourceTypeFontResource", "ResourceTypeFavicon",
+    )
+    FETCH_TIMEOUT = 10
+    # Hanya font dan script yang butuh CORS saat dimuat dari mirror; respon lain tanpa
+    # Access-Control-Allow-Origin supaya halaman lain tidak bisa membaca isi mirror
+    CORS_TYPES = ("font/", "application/font", "woff", "opentype", "truetype", "javascript", "ecmascript")
+
+    DOMAIN = ".localhost"
+
+    def __init__(self, root, hosts, max_age=300, port=0, max_bytes=100 * 1048576):
+        self.root = root
+        self.hosts = set(hosts)
+        self.max_age = max_age
+        self.port = port
+        self.max_bytes = max_bytes
+        self.server = None
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.prune_lock = threading.Lock()
+        self.written = 0  # byte yang ditulis sejak pemangkasan terakhir
+        self.cookies = {}  # (domain, path, nama) -> (nilai, secure)
+        os.makedirs(root, exist_ok=True)
+
+    # --- penyimpanan ---
+    def paths(self, url):
+        import hashlib
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.root, key), os.path.join(self.root, key + ".json")
+
+    def lookup(self, url):
+        """(meta, path body) kalau URL sudah tersimpan, selain itu None."""
+        body, meta_path = self.paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return (meta, body) if os.path.exists(body) else None
+
+    # --- cookie sesi ---
+    # Browser mengirim cookie ke *.localhost, bukan ke host asal: cookie profil WebEngine
+    # disalin ke sini (cookieAdded/cookieRemoved) supaya asset yang butuh sesi tetap bisa diambil
+    def add_cookie(self, cookie):
+        key = (cookie.domain(), cookie.path() or "/", bytes(cookie.name()).decode(errors="replace"))
+        self.cookies[key] = (bytes(cookie.value()).decode(errors="replace"), cookie.isSecure())
+
+    def remove_cookie(self, cookie):
+        key = (cookie.domain(), cookie.path() or "/", bytes(cookie.name()).decode(errors="replace"))
+        self.cookies.pop(key, None)
+
+    def cookie_header(self, url):
+        import urllib.parse
+        parts = urllib.parse.urlsplit(url)
+        host, path = parts.hostname or "", parts.path or "/"
+        pairs = []
+        for (domain, cookie_path, name), (value, secure) in list(self.cookies.items()):
+            if domain.startswith("."):
+                match = host == domain[1:] or host.endswith(domain)
+            else:
+                match = host == domain
+            if match and path.startswith(cookie_path) and (parts.scheme == "https" or not secure):
+                pairs.append(f"{name}={value}")
+        return "; ".join(pairs)
+
+    def fetch(self, url, meta=None, forward=None):
+        """Ambil dari server asal (conditional GET kalau sudah punya salinan), simpan ke disk.
+
+        Kembalikan (meta, None) kalau tersimpan / masih berlaku (304). Respon yang tidak boleh
+        disimpan (no-store/private, Set-Cookie, status selain 200) dikembalikan apa adanya
+        sebagai (None, (status, headers, body)) untuk diteruskan ke browser. Jaringan gagal:
+        (None, None).
+        """
+        import urllib.request, urllib.error
+        headers = {"User-Agent": "kiosk-mirror"}
+        headers.update(forward or {})
+        cookie = self.cookie_header(url)
+        if cookie:
+            headers["Cookie"] = cookie
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        body_path, meta_path = self.paths(url)
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers),
+                                        timeout=self.FETCH_TIMEOUT) as resp:
+                status, resp_headers, data = resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and meta:
+                # 304: salinan lama masih berlaku, cukup perbarui waktu
+                status, resp_headers, data = 304, e.headers, b""
+            else:
+                # 4xx/5xx asal diteruskan dengan status aslinya
+                try:
+                    data = e.read()
+                except OSError:
+                    data = b""
+                return None, (e.code, e.headers, data)
+        except (OSError, ValueError):
+            return None, None
+        if status != 304:
+            cache_control = (resp_headers.get("Cache-Control") or "").lower()
+            if (status != 200 or "no-store" in cache_control or "private" in cache_control
+                    or resp_headers.get("Set-Cookie")):
+                return None, (status, resp_headers, data)
+            meta = {
+                "url": url,
+                "type": resp_headers.get("Content-Type", "application/octet-stream"),
+                "etag": resp_headers.get("ETag"),
+                "last_modified": resp_headers.get("Last-Modified"),
+            }
+            tmp = "%s.%d.tmp" % (body_path, threading.get_ident())
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, body_path)
+            self.written += len(data)
+        meta["fetched_at"] = time.time()
+        tmp = "%s.%d.tmp" % (meta_path, threading.get_ident())
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+        if self.written > self.max_bytes // 10:
+            # asset ber-?v= baru terus menumpuk: pangkas tiap ~10% batas ditulis
+            self.prune()
+        return meta, None
+
+    def prune(self):
+        """Buang asset dengan fetched_at paling lama sampai isi folder di bawah max_bytes.
+
+        Asset yang masih dipakai selalu diperbarui tiap max_age, jadi fetched_at lama berarti
+        sudah tidak dipakai (mis. versi lama asset dengan ?v=)."""
+        if not self.prune_lock.acquire(blocking=False):
+            return
+        try:
+            self.written = 0
+            entries = []
+            total = 0
+            with os.scandir(self.root) as it:
+                files = {e.name: e for e in it if e.is_file()}
+            for name, entry in files.items():
+                if name.endswith(".tmp"):
+                    continue
+                key = name[:-5] if name.endswith(".json") else name
+                body, meta = files.get(key), files.get(key + ".json")
+                if body is None or meta is None:
+                    # sisa penulisan yang terputus
+                    self.remove(entry.path)
+                    continue
+                if name.endswith(".json"):
+                    size = body.stat().st_size + meta.stat().st_size
+                    try:
+                        with open(meta.path) as f:
+                            fetched_at = json.load(f).get("fetched_at", 0)
+                    except (OSError, ValueError):
+                        fetched_at = 0
+                    entries.append((fetched_at, size, body.path, meta.path))
+                    total += size
+            removed = 0
+            for fetched_at, size, body_path, meta_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self.remove(meta_path)
+                self.remove(body_path)
+                total -= size
+                removed += 1
+            if removed:
+                print(f"🧹 Mirror dipangkas: {removed} asset lama dibuang, sisa {total / 1048576:.1f} MB")
+        finally:
+            self.prune_lock.release()
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def revalidate(self, url, meta):
+        """Perbarui salinan di thread lain; satu URL hanya sekali berjalan."""
+        with self.lock:
+            if url in self.refreshing:
+                return
+            self.refreshing.add(url)
+
+        def run():
+            try:
+                self.fetch(url, meta)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(url)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def precache(self, urls):
+        """Pangkas lalu isi/perbarui mirror dari manifest di belakang, tidak menunda startup."""
+        def run():
+            self.prune()
+            fresh = 0
+            for url in urls:
+                entry = self.lookup(url)
+                if entry and time.time() - entry[0].get("fetched_at", 0) < self.max_age:
+                    fresh += 1
+                elif self.fetch(url, entry[0] if entry else None)[0]:
+                    fresh += 1
+            print(f"📦 Precache mirror: {fresh}/{len(urls)} URL siap offline")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def mirrors(self, host):
+        """Host boleh di-mirror? "*" = semua host publik, alamat IP lokal/privat tidak pernah."""
+        if not host:
+            return False
+        if host in self.hosts:
+            return True
+        if "*" not in self.hosts or host == "localhost":
+            return False
+        import ipaddress
+        try:
+            ip = ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            return True
+        return ip.is_global
+
+    # --- server lokal ---
+    def local_url(self, url):
+        """https://host/a.css -> http://https-443.host.localhost:PORT/a.css"""
+        import urllib.parse
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        host = f"{parts.scheme}-{port}.{parts.hostname}{self.DOMAIN}:{self.port}"
+        return urllib.parse.urlunsplit(("http", host, parts.path or "/", parts.query, ""))
+
+    def upstream_url(self, host, path):
+        """Kebalikan local_url dari header Host + path request; None kalau bukan URL mirror."""
+        host = host.rsplit(":", 1)[0].lower()
+        if not host.endswith(self.DOMAIN):
+            return None
+        origin, _, upstream = host[:-len(self.DOMAIN)].partition(".")
+        scheme, _, port = origin.partition("-")
+        if scheme not in ("http", "https") or not port.isdigit() or not upstream:
+            return None
+        if int(port) != (443 if scheme == "https" else 80):
+            upstream = f"{upstream}:{port}"
+        return f"{scheme}://{upstream}{path}"
+
+    def start(self):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Header browser yang ikut diteruskan ke server asal saat asset belum tersimpan
+            FORWARD_HEADERS = ("Accept", "Accept-Language", "User-Agent")
+
+            def allowed_url(self):
+                """URL asal kalau host-nya memang di-mirror; selain itu jawab 403."""
+                import urllib.parse
+                url = mirror.upstream_url(self.headers.get("Host", ""), self.path)
+                if url and mirror.mirrors(urllib.parse.urlsplit(url).hostname):
+                    return url
+                # tanpa ini halaman apa pun bisa membaca alamat LAN/intranet lewat mirror
+                self.send_response(403)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+
+            def do_OPTIONS(self):
+                if self.allowed_url() is None:
+                    return
+                # preflight font/script dari halaman https ke loopback: CORS + Private Network Access
+                self.send_response(204)
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Access-Control-Allow-Private-Network", "true")
+                self.send_header("Access-Control-Allow-Headers", "*")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                url = self.allowed_url()
+                if url is None:
+                    return
+                entry = mirror.lookup(url)
+                if entry is None:
+                    forward = {name: self.headers[name] for name in self.FORWARD_HEADERS if self.headers[name]}
+                    meta, live = mirror.fetch(url, forward=forward)
+                    if live is not None:
+                        # tidak boleh/bisa disimpan: teruskan apa adanya, mirror tidak boleh
+                        # membuat asset yang jalan normal jadi gagal
+                        self.send_body(live[0], live[1].get("Content-Type"), live[2],
+                                       live[1].get("Cache-Control", "no-store"))
+                        return
+                    entry = (meta, mirror.paths(url)[0]) if meta else None
+                elif time.time() - entry[0].get("fetched_at", 0) > mirror.max_age:
+                    # layani salinan lama sekarang, perbarui di belakang
+                    mirror.revalidate(url, entry[0])
+                if entry is None:
+                    self.send_response(502)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                meta, body = entry
+                try:
+                    with open(body, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    self.send_error(502)
+                    return
+                self.send_body(200, meta.get("type"), data, "max-age=60")
+
+            def send_body(self, status, content_type, data, cache_control):
+                content_type = content_type or "application/octet-stream"
+                self.send_response(status)
+                if any(t in content_type.lower() for t in mirror.CORS_TYPES):
+                    # font dan <script crossorigin> dari halaman asal butuh CORS
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", cache_control)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🪞 Mirror asset di 127.0.0.1:{self.port} untuk {', '.join(sorted(self.hosts))}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def make_interceptor(self, parent=None):
+        """Interceptor profil WebEngine yang mengalihkan GET asset statis ke mirror."""
+        from PySide6.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+        mirror = self
+        types = {getattr(QWebEngineUrlRequestInfo, name) for name in self.RESOURCE_TYPES}
+
+        class MirrorInterceptor(QWebEngineUrlRequestInterceptor):
+            # Dipanggil di thread IO WebEngine: hanya operasi string, tanpa I/O
+            def interceptRequest(self, info):
+                if info.requestMethod() != b"GET" or info.resourceType() not in types:
+                    return
+                url = info.requestUrl()
+                # host IPv6 tidak bisa dijadikan label *.localhost
+                if url.scheme() not in ("http", "https") or ":" in url.host():
+                    return
+                if not mirror.mirrors(url.host()):
+                    return
+                info.redirect(QUrl(mirror.local_url(url.toString())))
+
+        return MirrorInterceptor(parent)
+
+
+def start_asset_mirror(start_url):
+    """Mirror + precache dari kiosk.txt; None kalau dimatikan atau gagal jalan."""
+    if not cfg("mirror", True):
+        return None
+    hosts = [h.strip() for h in cfg("mirror_hosts", "").split(",") if h.strip()]
+    hosts = hosts or [QUrl(start_url).host()]
+    mirror = AssetMirror(cfg("mirror_dir", "mirror"), hosts, cfg("mirror_max_age", 300), cfg("mirror_port", 0),
+                         cfg("mirror_max_mb", 100) * 1048576)
+    try:
+        mirror.start()
+    except OSError as e:
+        print("⚠️ Mirror asset tidak bisa jalan:", e)
+        return None
+    # dokumen halaman awal selalu ikut, dipakai sebagai shell saat offline
+    urls = [start_url] + [u for u in read_manifest(cfg("mirror_manifest", "precache.txt")) if u != start_url]
+    mirror.precache(urls)
+    return mirror
+
+
+# ===== Import Budget =====
+# Modul yang tidak boleh ter-import sebelum jendela pertama tampil
+DEFERRED_MODULES = (
+    "pyautogui", "Xlib", "pymsgbox", "pyscreeze", "PIL", "serial",
+    "PySide6.QtWebEngineWidgets", "PySide6.QtWebEngineCore", "PySide6.QtWebChannel",
+)
+
+
+def check_import_budget(budget_ms):
+    """Cek regresi import startup: 0 kalau lolos, 1 kalau gagal (untuk --check-import-budget)."""
+    elapsed = (time.perf_counter() - BOOT_T0) * 1000
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+    print(f"⏱️ Import modul: {elapsed:.0f} ms (budget {budget_ms} ms)")
+    if loaded:
+        print("❌ Modul berat ter-import saat startup:", ", ".join(loaded))
+    if elapsed > budget_ms:
+        print("❌ Import melebihi budget")
+    if loaded or elapsed > budget_ms:
+        return 1
+    print("✅ Import startup dalam budget")
+    return 0
+
+
 # ===== Main App =====
+# Halaman login/setting/WiFi, dimuat sebagai file supaya bisa di-cache browser
+ADMIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "admin")
+
+
 class WebApp(QMainWindow):
-    def __init__(self):
+    # Jeda penggabungan tombol keyboard virtual = satu frame layar
+    KEY_FLUSH_MS = 16
+
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler or StartupProfiler()
         self.current_ssid = ""
         self.caps_lock = False
-        
-        self.data_sender = DataSender(self)
+        self.key_queue = []
+        self.letter_keys = []
+
+        # Diisi bertahap oleh boot_webengine() dan boot_services()
+        self.browser = None
+        self.serial_thread = None
+        self.wifi_monitor = None
+        self.data_sender = None
+        self.journal = None
+        self.web_profile = None
+        self.cache_reported = False
+        self.mirror = None
+        self.view_stack = None
+        self.admin_view = None
+        self.offline_shell = False  # halaman sedang ditampilkan dari salinan mirror
+        self.shell_loading = False  # loadFinished berikutnya milik setHtml salinan offline
+        # Selama salinan offline tampil, halaman asli dicoba lagi berkala: server/DNS bisa
+        # pulih walau WiFi tidak pernah putus
+        self.offline_retry = QTimer(self)
+        self.offline_retry.setInterval(cfg("offline_retry", 30) * 1000)
+        self.offline_retry.timeout.connect(self.retry_start_page)
+        self.stats = KioskStats()
+        self.tap_queue = None
+        self.wifi_connected = None
 
         central = QWidget()
         self.setCentralWidget(central)
-        layout = QVBoxLayout(central)
+        layout = self.main_layout = QVBoxLayout(central)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
@@ -317,109 +2470,25 @@ class WebApp(QMainWindow):
             }
         """)
         self.refresh_btn.clicked.connect(self.refresh_page)
+        self.refresh_btn.setEnabled(False)  # aktif setelah WebEngine siap
         hl.addWidget(self.refresh_btn)
 
         layout.addWidget(header)
 
-        # Browser
-        self.browser = QWebEngineView()
-        layout.addWidget(self.browser, stretch=7)
-
-        try:
-            with open("urlx.txt", "r") as f:
-                start_url = f.read().strip()
-        except:
-            start_url = "https://pesatkantin.com/order-self"
-
-        self.browser.setUrl(QUrl(start_url))
-        
-        # Connect signal untuk update title ketika halaman dimuat
-        self.browser.titleChanged.connect(self.update_page_title)
-        self.browser.loadFinished.connect(self.on_page_loaded)
-
+        # Tempat browser; QWebEngineView dibuat setelah jendela pertama tampil
+        self.browser_placeholder = QLabel("Memuat...")
+        self.browser_placeholder.setAlignment(Qt.AlignCenter)
+        self.browser_placeholder.setStyleSheet("font-size:18px;color:#888;")
+        layout.addWidget(self.browser_placeholder, stretch=7)
 
-        # Keyboard
+        # Keyboard: tempatnya disiapkan, tombol dibangun saat pertama dibutuhkan
         self.keyboard_widget = QWidget()
-        self.keyboard_widget.setVisible(False)
+        self.keyboard_built = False
+        self.set_keyboard_visible(False)
         layout.addWidget(self.keyboard_widget)
-        
-        # Buat layout untuk keyboard dengan styling
-        keyboard_layout = QVBoxLayout(self.keyboard_widget)
-        keyboard_layout.setContentsMargins(10, 10, 10, 10)
-        keyboard_layout.setSpacing(5)
-        
-        # Container untuk keyboard
-        keyboard_container = QWidget()
-        keyboard_container.setStyleSheet("""
-            QWidget {
-                background-color: #f0f0f0;
-                border-radius: 10px;
-                padding: 5px;
-            }
-        """)
-        keyboard_layout.addWidget(keyboard_container)
-        
-        grid = QGridLayout(keyboard_container)
-        grid.setSpacing(5)
-        
-        # Baris keyboard - huruf kecil sebagai default
-        rows = [
-            list("qwertyu12"),
-            list("asdfghj34"),
-            list("zxcvbnm56"),
-            list("ioklp-_78"),
-            ["@", "#", "%", "&", "*", "(", ")", "0", "9"],
-            ["=", ".", ",", "?", "/", "+", ":"]
-        ]
-        
-        # Buat tombol keyboard
-        r = 0
-        for row in rows:
-            c = 0
-            for k in row:
-                btn = self.make_button(k)
-                if r == 4:  # Baris karakter khusus
-                    grid.addWidget(btn, r, c, 1, 1)
-                else:
-                    grid.addWidget(btn, r, c)
-                c += 1
-            r += 1
-        
-        # Baris tombol fungsional
-        caps_btn = self.make_button("Caps")
-        space_btn = self.make_button("Space")
-        backspace_btn = self.make_button("⌫")
-        enter_btn = self.make_button("Enter")
-        close_btn = self.make_button("Close")
-        
-        # Mengatur tata letak tombol fungsional
-        grid.addWidget(caps_btn, r, 0, 1, 2)
-        grid.addWidget(space_btn, r, 2, 1, 3)
-        grid.addWidget(backspace_btn, r, 5, 1, 2)
-        grid.addWidget(close_btn, r, 7, 1, 2)
-        grid.addWidget(enter_btn, r-1, 7, 1, 2)
-
-        self.showFullScreen()
-
-        # Focus timer
-        self.focus_timer = QTimer()
-        self.focus_timer.timeout.connect(self.check_focused_element)
-        self.focus_timer.start(500)
 
-        # Serial + WiFi Monitor
-        self.serial_thread = SerialThread(PORT, BAUD)
-        self.serial_thread.data_received.connect(self.handle_rfid)
-        self.serial_thread.start()
-        
-        self.wifi_monitor = WiFiMonitor()
-        self.wifi_monitor.wifi_status_changed.connect(self.update_wifi_status)
-        self.wifi_monitor.start()
-
-        # WebChannel
-        self.channel = QWebChannel()
-        self.bridge = Bridge(self)
-        self.channel.registerObject("pywebchannel", self.bridge)
-        self.browser.page().setWebChannel(self.channel)
+        # Cache scan WiFi untuk menu; scan pertama dimulai di boot_services()
+        self.wifi_scanner = WiFiScanService(cfg("wifi_scan_ttl", 30), self)
         
         # === Footer dengan tombol Setting & Shutdown ===
         footer = QWidget()
@@ -428,7 +2497,7 @@ class WebApp(QMainWindow):
         fl.addStretch()
 
         # 🔧 Tombol Setting (UBAH: klik langsung ke login)
-        setting_btn = QPushButton("⚙️")
+        setting_btn = self.setting_btn = QPushButton("⚙️")
         setting_btn.setFixedSize(60, 50)
         setting_btn.setStyleSheet("""
             QPushButton {
@@ -444,6 +2513,7 @@ class WebApp(QMainWindow):
             }
         """)
         setting_btn.clicked.connect(self.open_login_html)  # UBAH: langsung ke login
+        setting_btn.setEnabled(False)  # aktif setelah WebEngine siap
         fl.addWidget(setting_btn)
 
         # ⏻ Tombol Shutdown
@@ -467,7 +2537,115 @@ class WebApp(QMainWindow):
 
         layout.addWidget(footer)
 
+        # Tahap 1: jendela minimal tampil dulu, WebEngine & service menyusul
         self.showFullScreen()
+        self.profiler.mark("jendela tampil")
+        QTimer.singleShot(0, lambda: self.run_boot_stage(self.boot_webengine))
+
+    def run_boot_stage(self, stage):
+        """Tahap boot berjalan dari event loop: exception di sini tidak menghentikan proses,
+        jadi dicetak lalu aplikasi keluar dengan kode 1 supaya systemd me-restart kiosk."""
+        try:
+            stage()
+        except Exception:
+            traceback.print_exc()
+            print(f"❌ Boot gagal di tahap {stage.__name__}, keluar")
+            self.close()
+            QApplication.exit(1)
+
+    def boot_webengine(self):
+        """Tahap 2: import dan buat QWebEngineView + WebChannel, lalu mulai muat halaman."""
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+        from PySide6.QtWebEngineCore import QWebEnginePage
+        from PySide6.QtWebChannel import QWebChannel
+        self.profiler.mark("import WebEngine")
+
+        self.browser = QWebEngineView()
+        self.web_profile = make_web_profile()
+        if self.web_profile is not None:
+            self.browser.setPage(QWebEnginePage(self.web_profile, self.browser))
+        self.mirror = start_asset_mirror(self.start_url())
+        if self.mirror:
+            # interceptor dipasang sebelum halaman pertama dimuat
+            self.mirror_interceptor = self.mirror.make_interceptor(self)
+            profile = self.browser.page().profile()
+            profile.setUrlRequestInterceptor(self.mirror_interceptor)
+            # cookie sesi situs asal ikut dikirim mirror saat mengambil asset
+            cookies = profile.cookieStore()
+            cookies.cookieAdded.connect(self.mirror.add_cookie)
+            cookies.cookieRemoved.connect(self.mirror.remove_cookie)
+            cookies.loadAllCookies()
+        # Halaman pemesanan dan halaman admin bergantian di satu stack,
+        # halaman pemesanan tidak pernah dibongkar saat admin dibuka
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.browser)
+        self.main_layout.replaceWidget(self.browser_placeholder, self.view_stack)
+        self.browser_placeholder.deleteLater()
+        self.browser_placeholder = None
+
+        # WebChannel + kiosk script dipasang sebelum halaman pertama dimuat
+        self.channel = QWebChannel()
+        self.bridge = TapBridge(self, self.browser)
+        self.channel.registerObject("kiosk", self.bridge)
+        self.browser.page().setWebChannel(self.channel)
+        self.install_kiosk_script()
+        self.delivery = make_delivery(self)
+        # Tap menunggu di antrean sampai halaman selesai dimuat dan ada input yang fokus
+        self.tap_queue = TapQueue(self, cfg("tap_queue_max", 8), cfg("tap_queue_max_wait", 20.0),
+                                  cfg("tap_queue_policy", "oldest"), cfg("tap_queue_wait_input", True))
+        self.stats.tap_queue = self.tap_queue
+        self.browser.loadStarted.connect(self.tap_queue.page_load_started)
+
+        # Connect signal untuk update title ketika halaman dimuat
+        self.browser.titleChanged.connect(
+            lambda title: self.update_page_title(title) if self.active_view() is self.browser else None)
+        self.browser.loadFinished.connect(self.on_page_loaded)
+
+        self.browser.setUrl(QUrl(self.start_url()))
+        self.refresh_btn.setEnabled(True)
+        self.setting_btn.setEnabled(True)
+        self.profiler.mark("WebEngine + muat URL")
+        QTimer.singleShot(0, lambda: self.run_boot_stage(self.boot_services))
+
+    def start_url(self):
+        try:
+            with open("urlx.txt", "r") as f:
+                return f.read().strip()
+        except:
+            return "https://pesatkantin.com/order-self"
+
+    def boot_services(self):
+        """Tahap 3: reader RFID, monitor WiFi dan heartbeat."""
+        self.start_reader()
+
+        self.wifi_scanner.scan()
+
+        # Status WiFi: D-Bus NetworkManager, fallback nmcli
+        self.wifi_monitor = NMDBusMonitor(cfg("wifi_iface", "wlan0"), self)
+        self.wifi_monitor.wifi_status_changed.connect(self.update_wifi_status)
+        if not self.wifi_monitor.start():
+            print("⚠️ Pakai nmcli untuk status WiFi")
+            self.wifi_monitor = WiFiMonitor()
+            self.wifi_monitor.wifi_status_changed.connect(self.update_wifi_status)
+            self.wifi_monitor.start()
+
+        self.data_sender = DataSender(self.stats)
+        self.data_sender.start()
+        self.profiler.mark("service reader/WiFi")
+
+    def start_reader(self):
+        """Jurnal tap + thread reader serial (juga dipakai rfid_bench.py)."""
+        journal_path = cfg("journal", "taps.db")
+        if journal_path != "off":
+            try:
+                self.journal = TapJournal(journal_path, cfg("journal_sync", "NORMAL"))
+            except Exception as e:
+                print("⚠️ Jurnal tap tidak bisa dibuka, tap tidak dicatat:", e)
+
+        self.serial_thread = SerialThread(reader_ports(), BAUD, self.journal)
+        self.stats.serial_thread = self.serial_thread
+        self.serial_thread.data_received.connect(self.handle_rfid)
+        self.serial_thread.start()
      
     def load_passwords(self):
         """Load password dari login.txt"""
@@ -498,15 +2676,75 @@ class WebApp(QMainWindow):
             
     def on_page_loaded(self, success):
         """Callback ketika halaman selesai dimuat"""
+        self.profiler.finish("halaman pertama dimuat")
+        back_online = False
+        if self.shell_loading:
+            self.shell_loading = False
+        elif success and self.offline_shell:
+            self.leave_offline_shell()
+            back_online = True
+        self.tap_queue.page_load_finished(success)
         if success:
+            if back_online:
+                QTimer.singleShot(0, self.replay_pending_taps)
+            if not self.cache_reported:
+                self.cache_reported = True
+                self.browser.page().runJavaScript(CACHE_REPORT_JS, self.report_cache_warmth)
+            # Halaman sudah tampil: bangun keyboard di waktu idle supaya fokus pertama tidak tersendat
+            if not self.keyboard_built:
+                QTimer.singleShot(0, self.build_keyboard)
+            # View admin disiapkan saat idle supaya Setting terbuka tanpa jeda
+            if self.admin_view is None:
+                QTimer.singleShot(0, self.ensure_admin_view)
             # Ambil title dengan JavaScript jika titleChanged tidak triggered
             self.browser.page().runJavaScript(
                 "document.title", 
                 self.update_page_title_from_js
             )
-        else:
+        elif not self.show_offline_shell():
             self.title_label.setText("Failed to load")
+
+    def show_offline_shell(self):
+        """Halaman gagal dimuat: tampilkan salinan halaman awal dari mirror (asset tetap lewat mirror)."""
+        if not self.mirror:
+            return False
+        start_url = self.start_url()
+        entry = self.mirror.lookup(start_url)
+        if entry is None:
+            return False
+        try:
+            with open(entry[1], "rb") as f:
+                html = f.read().decode("utf-8", errors="replace")
+        except OSError:
+            return False
+        if not self.offline_shell:
+            print("📴 Halaman gagal dimuat, tampilkan salinan offline")
+            self.offline_retry.start()
+        self.offline_shell = True
+        self.shell_loading = True
+        # baseUrl asli: URL relatif tetap menuju host asal lalu dialihkan interceptor ke mirror
+        self.browser.setHtml(html, QUrl(start_url))
+        return True
+
+    def retry_start_page(self):
+        """Coba muat halaman asli; kalau gagal lagi on_page_loaded kembali ke salinan offline."""
+        self.browser.setUrl(QUrl(self.start_url()))
+
+    def leave_offline_shell(self):
+        print("🌐 Halaman asli berhasil dimuat lagi")
+        self.offline_shell = False
+        self.offline_retry.stop()
             
+    def report_cache_warmth(self, result):
+        """Berapa banyak resource halaman pertama yang diambil dari cache disk."""
+        try:
+            r = json.loads(result)
+        except (TypeError, ValueError):
+            return
+        print(f"♨️ Halaman pertama: {r['cached']}/{r['total']} resource dari cache "
+              f"({r['cachedBytes'] / 1048576:.1f} MB), {r['network']} dari jaringan "
+              f"({r['networkBytes'] / 1048576:.1f} MB), {r['unknown']} tidak diketahui")
+
     def update_page_title_from_js(self, title):
         """Update title dari hasil JavaScript"""
         if title and title != self.title_label.text():
@@ -521,778 +2759,263 @@ class WebApp(QMainWindow):
             
     def refresh_page(self):
         self.title_label.setText("Loading...")
-        self.browser.reload()
+        if self.offline_shell and self.active_view() is self.browser:
+            # reload() hanya memuat ulang salinan offline
+            self.retry_start_page()
+        else:
+            self.active_view().reload()
+
+    # ===== Views =====
+    def active_view(self):
+        """View yang sedang tampil (halaman pemesanan atau admin)."""
+        return self.view_stack.currentWidget() if self.view_stack else self.browser
+
+    def ensure_admin_view(self):
+        """View kedua untuk login/setting/WiFi, dengan WebChannel + Bridge sendiri."""
+        if self.admin_view is not None:
+            return self.admin_view
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+        from PySide6.QtWebEngineCore import QWebEnginePage
+        from PySide6.QtWebChannel import QWebChannel
+        view = QWebEngineView()
+        # Profil sama dengan halaman pemesanan: satu proses browser, tanpa cache ganda
+        view.setPage(QWebEnginePage(self.browser.page().profile(), view))
+        self.admin_channel = QWebChannel()
+        self.admin_bridge = Bridge(self, view)
+        self.admin_channel.registerObject("pywebchannel", self.admin_bridge)
+        view.page().setWebChannel(self.admin_channel)
+        self.install_kiosk_script(view)
+        view.titleChanged.connect(
+            lambda title: self.update_page_title(title) if self.active_view() is view else None)
+        self.view_stack.addWidget(view)
+        self.admin_view = view
+        return view
+
+    def show_admin_page(self, name):
+        """Buka admin/<name>. Halaman yang masih termuat cukup di-reset, tanpa dimuat ulang."""
+        view = self.ensure_admin_view()
+        url = QUrl.fromLocalFile(os.path.join(ADMIN_DIR, name))
+        if view.url() == url:
+            view.page().runJavaScript("window.adminReset && adminReset();")
+        else:
+            view.setUrl(url)
+        self.view_stack.setCurrentWidget(view)
+
+    def show_ordering_page(self):
+        """Kembali ke halaman pemesanan yang tetap hidup di belakang (tanpa request jaringan)."""
+        self.set_keyboard_visible(False)
+        if self.active_view() is self.browser:
+            return
+        self.view_stack.setCurrentWidget(self.browser)
+        self.update_page_title(self.browser.title())
+        # Kosongkan isian halaman admin supaya password yang diketik tidak tertinggal di DOM
+        if self.admin_view is not None:
+            self.admin_view.page().runJavaScript(
+                "document.querySelectorAll('input').forEach(function(i){i.value='';});")
+        # tap yang datang selama halaman admin terbuka
+        self.tap_queue.drain()
     
-    # ===== Login HTML =====
+    # ===== Halaman Admin (admin/*.html) =====
     def open_login_html(self):
         """Tampilkan halaman login sebelum masuk setting"""
-        self.keyboard_widget.setVisible(True)
+        self.set_keyboard_visible(True)
+        self.show_admin_page("login.html")
+
+    # ===== Keyboard =====
+    def build_keyboard(self):
+        """Bangun tombol keyboard virtual (sekali saja, saat pertama dibutuhkan atau saat idle)."""
+        if self.keyboard_built:
+            return
+        self.keyboard_built = True
+        started = time.perf_counter()
+
+        # Buat layout untuk keyboard dengan styling
+        keyboard_layout = QVBoxLayout(self.keyboard_widget)
+        keyboard_layout.setContentsMargins(10, 10, 10, 10)
+        keyboard_layout.setSpacing(5)
         
-        html = """
-        <!DOCTYPE html>
-        <html lang="id">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Password Setting</title>
-            <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
-            <style>
-                * {
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                }
-                
-                body {
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    padding: 20px;
-                }
-                
-                .login-container {
-                    background-color: rgba(255, 255, 255, 0.95);
-                    border-radius: 20px;
-                    box-shadow: 0 15px 35px rgba(0, 0, 0, 0.2);
-                    width: 100%;
-                    max-width: 400px;
-                    padding: 40px 30px;
-                    text-align: center;
-                }
-                
-                .lock-icon {
-                    font-size: 48px;
-                    color: #667eea;
-                    margin-bottom: 20px;
-                }
-                
-                h1 {
-                    color: #333;
-                    margin-bottom: 30px;
-                    font-size: 28px;
-                    font-weight: 600;
-                }
-                
-                .input-group {
-                    margin-bottom: 20px;
-                    text-align: left;
-                }
-                
-                label {
-                    display: block;
-                    margin-bottom: 8px;
-                    color: #555;
-                    font-weight: 500;
-                    font-size: 14px;
-                }
-                
-                .password-container {
-                    position: relative;
-                    width: 100%;
-                }
-                
-                input[type="password"], input[type="text"] {
-                    width: 100%;
-                    padding: 15px;
-                    border: 2px solid #ddd;
-                    border-radius: 10px;
-                    font-size: 16px;
-                    transition: all 0.3s ease;
-                    background-color: #f8f9fa;
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    letter-spacing: 0.5px;
-                }
-                
-                input[type="password"]:focus, input[type="text"]:focus {
-                    border-color: #667eea;
-                    background-color: white;
-                    outline: none;
-                    box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-                }
-                
-                .button-group {
-                    display: flex;
-                    gap: 15px;
-                    margin-top: 25px;
-                }
-                
-                button {
-                    flex: 1;
-                    padding: 15px;
-                    border: none;
-                    border-radius: 10px;
-                    font-size: 16px;
-                    font-weight: 600;
-                    cursor: pointer;
-                    transition: all 0.3s ease;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                }
-                
-                .login-btn {
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-                }
-                
-                .login-btn:hover {
-                    transform: translateY(-2px);
-                    box-shadow: 0 6px 20px rgba(102, 126, 234, 0.6);
-                }
-                
-                .cancel-btn {
-                    background-color: #f8f9fa;
-                    color: #333;
-                    border: 2px solid #ddd;
-                }
-                
-                .cancel-btn:hover {
-                    background-color: #e9ecef;
-                    transform: translateY(-2px);
-                }
-                
-                .error-message {
-                    background-color: #ffebee;
-                    color: #d32f2f;
-                    padding: 12px;
-                    border-radius: 8px;
-                    margin-top: 15px;
-                    font-size: 14px;
-                    display: none;
-                    border-left: 4px solid #d32f2f;
-                }
-                
-                .show-password {
-                    display: flex;
-                    align-items: center;
-                    gap: 8px;
-                    margin-top: 8px;
-                    font-size: 14px;
-                    color: #666;
-                }
-                
-                .show-password input[type="checkbox"] {
-                    width: auto;
-                    margin: 0;
-                }
-            </style>
-        </head>
-        <body onload="setupChannel()">
-            <div class="login-container">
-                <h1>Masukkan Password</h1>
-                
-                <div class="input-group">
-                    <label for="password">Password Setting</label>
-                    <div class="password-container">
-                        <input type="password" id="password" placeholder="Masukkan password" autofocus>
-                    </div>
-                    <div class="show-password">
-                        <input type="checkbox" id="showPass" onchange="togglePassword()">
-                        <label for="showPass">Tampilkan password</label>
-                    </div>
-                </div>
-                
-                <div class="button-group">
-                    <button class="login-btn" onclick="checkPassword()">Masuk</button>
-                    <button class="cancel-btn" onclick="goHome()">Batal</button>
-                </div>
-                
-                <div id="errorMessage" class="error-message"></div>
-            </div>
-
-            <script>
-                function setupChannel() {
-                    new QWebChannel(qt.webChannelTransport, function(channel) {
-                        window.pywebchannel = channel.objects.pywebchannel;
-                    });
-                }
-                
-                function togglePassword() {
-                    var passwordField = document.getElementById('password');
-                    var checkbox = document.getElementById('showPass');
-                    
-                    // Simpan nilai dan fokus saat ini
-                    var currentValue = passwordField.value;
-                    var isFocused = (document.activeElement === passwordField);
-                    
-                    // Ubah tipe input
-                    passwordField.type = checkbox.checked ? 'text' : 'password';
-                    
-                    // Pertahankan nilai dan fokus
-                    passwordField.value = currentValue;
-                    if (isFocused) {
-                        passwordField.focus();
-                    }
-                }
-                
-                function checkPassword() {
-                    var password = document.getElementById('password').value;
-                    var errorElement = document.getElementById('errorMessage');
-                    
-                    if (!password) {
-                        errorElement.textContent = "Password harus diisi!";
-                        errorElement.style.display = "block";
-                        return;
-                    }
-                    
-                    if (window.pywebchannel) {
-                        // Panggil fungsi checkPassword di Python
-                        window.pywebchannel.checkPassword(password, function(result) {
-                            if (result) {
-                                // Login berhasil, redirect ke setting
-                                showSettingPage();
-                            } else {
-                                errorElement.textContent = "Password salah!";
-                                errorElement.style.display = "block";
-                                // Clear password field
-                                document.getElementById('password').value = '';
-                                document.getElementById('password').focus();
-                            }
-                        });
-                    } else {
-                        errorElement.textContent = "WebChannel belum siap, coba lagi sebentar.";
-                        errorElement.style.display = "block";
-                    }
-                }
-                
-                function showSettingPage() {
-                    // Pindah ke halaman setting setelah login berhasil
-                    if (window.pywebchannel) {
-                        window.pywebchannel.showSettingPage();
-                    }
-                }
-                
-                function goHome() {
-                    if (window.pywebchannel) {
-                        window.pywebchannel.goHome();
-                    }
-                }
-                
-                // Handle Enter key
-                document.addEventListener('keypress', function(e) {
-                    if (e.key === 'Enter') {
-                        checkPassword();
-                    }
-                });
-            </script>
-        </body>
-        </html>
-        """
+        # Container untuk keyboard
+        keyboard_container = QWidget()
+        keyboard_container.setObjectName("keyboardContainer")
+        keyboard_layout.addWidget(keyboard_container)
         
-        self.browser.setHtml(html)
-        self.browser.page().runJavaScript("""
-            new QWebChannel(qt.webChannelTransport, function(channel) {
-                window.pywebchannel = channel.objects.pywebchannel;
-            });
-        """)
+        grid = QGridLayout(keyboard_container)
+        grid.setSpacing(5)
+        
+        # Baris keyboard - huruf kecil sebagai default
+        rows = [
+            list("qwertyu12"),
+            list("asdfghj34"),
+            list("zxcvbnm56"),
+            list("ioklp-_78"),
+            ["@", "#", "%", "&", "*", "(", ")", "0", "9"],
+            ["=", ".", ",", "?", "/", "+", ":"]
+        ]
+        
+        # Buat tombol keyboard
+        r = 0
+        for row in rows:
+            c = 0
+            for k in row:
+                btn = self.make_button(k)
+                if r == 4:  # Baris karakter khusus
+                    grid.addWidget(btn, r, c, 1, 1)
+                else:
+                    grid.addWidget(btn, r, c)
+                c += 1
+            r += 1
+        
+        # Baris tombol fungsional
+        caps_btn = self.caps_btn = self.make_button("Caps")
+        space_btn = self.make_button("Space")
+        backspace_btn = self.make_button("⌫")
+        enter_btn = self.make_button("Enter")
+        close_btn = self.make_button("Close")
+        
+        # Mengatur tata letak tombol fungsional
+        grid.addWidget(caps_btn, r, 0, 1, 2)
+        grid.addWidget(space_btn, r, 2, 1, 3)
+        grid.addWidget(backspace_btn, r, 5, 1, 2)
+        grid.addWidget(close_btn, r, 7, 1, 2)
+        grid.addWidget(enter_btn, r-1, 7, 1, 2)
+
+        print(f"⌨️ Keyboard dibangun dalam {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def set_keyboard_visible(self, visible):
+        if visible:
+            self.build_keyboard()
+        self.keyboard_widget.setVisible(visible)
 
-    # ===== Keyboard =====
     def make_button(self, text):
-        btn = QPushButton(text)
-        btn.setFixedHeight(50)
-        
-        # Styling tombol berdasarkan jenisnya
         if text == "Caps":
-            btn.setStyleSheet("""
-                QPushButton {
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: #d0d0d0;
-                    border: 2px solid #b0b0b0;
-                    border-radius: 5px;
-                }
-                QPushButton:pressed {
-                    background-color: #a0a0a0;
-                }
-            """)
+            role = "caps"
         elif text in ["Space", "Enter", "Close"]:
-            btn.setStyleSheet("""
-                QPushButton {
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: #4a86e8;
-                    color: white;
-                    border: 2px solid #3a76d8;
-                    border-radius: 5px;
-                }
-                QPushButton:pressed {
-                    background-color: #3a76d8;
-                }
-            """)
+            role = "fn"
         elif text == "⌫":
-            btn.setStyleSheet("""
-                QPushButton {
-                    font-size: 20px;
-                    font-weight: bold;
-                    background-color: #ff6b6b;
-                    color: white;
-                    border: 2px solid #e55b5b;
-                    border-radius: 5px;
-                }
-                QPushButton:pressed {
-                    background-color: #e55b5b;
-                }
-            """)
+            role = "backspace"
+        elif text in SYMBOL_KEYS:
+            role = "symbol"
         else:
-            if text in ["@", "#", "%", "&", "*", "(", ")", "-", "_", "+", "=", "<", ">", "?", "/"]:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        font-size: 14px;
-                        background-color: white;
-                        border: 2px solid #d0d0d0;
-                        border-radius: 5px;
-                    }
-                    QPushButton:pressed {
-                        background-color: #e0e0e0;
-                    }
-                """)
-            else:
-                btn.setStyleSheet("""
-                    QPushButton {
-                        font-size: 18px;
-                        background-color: white;
-                        border: 2px solid #d0d0d0;
-                        border-radius: 5px;
-                    }
-                    QPushButton:pressed {
-                        background-color: #e0e0e0;
-                    }
-                """)
-        
-        def on_click():
-            if text == "Caps":
-                self.caps_lock = not self.caps_lock
-                # Update tampilan tombol Caps Lock
-                btn.setStyleSheet(f"""
-                    QPushButton {{
-                        font-size: 16px;
-                        font-weight: bold;
-                        background-color: {'#ADD8E6' if self.caps_lock else '#d0d0d0'};
-                        border: 2px solid #b0b0b0;
-                        border-radius: 5px;
-                    }}
-                    QPushButton:pressed {{
-                        background-color: #a0a0a0;
-                    }}
-                """)
-                self.update_keyboard_keys()
-            else:
-                self.send_key(text)
-        
-        btn.clicked.connect(on_click)
+            role = "key"
+
+        btn = KeyButton(text, role)
+        if len(text) == 1 and text.isalpha():
+            self.letter_keys.append(btn)
+        btn.clicked.connect(lambda checked=False, k=text: self.on_key_clicked(k))
         return btn
 
-    def update_keyboard_keys(self):
-        for btn in self.keyboard_widget.findChildren(QPushButton):
-            text = btn.text()
-            if len(text) == 1 and text.isalpha():
-                btn.setText(text.upper() if self.caps_lock else text.lower())
+    def on_key_clicked(self, text):
+        if text == "Caps":
+            self.caps_lock = not self.caps_lock
+            # Warna Caps diatur selector [caps="true"], cukup polish ulang tombol ini saja
+            self.caps_btn.setProperty("caps", self.caps_lock)
+            self.caps_btn.style().unpolish(self.caps_btn)
+            self.caps_btn.style().polish(self.caps_btn)
+            self.update_keyboard_keys()
+        else:
+            self.send_key(text)
 
-    def check_focused_element(self):
-        js = "var f=document.activeElement;if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){'input';}else{'none';}"
-        self.browser.page().runJavaScript(js, self.handle_focus_check)
+    def update_keyboard_keys(self):
+        for btn in self.letter_keys:
+            btn.setText(btn.key.upper() if self.caps_lock else btn.key)
 
-    def handle_focus_check(self, res): 
-        self.keyboard_widget.setVisible(res == 'input')
+    def handle_focus_change(self, focused, view=None):
+        if view is self.browser:
+            self.tap_queue.set_input_ready(focused)
+        # Fokus dari view yang sedang tersembunyi tidak boleh memunculkan keyboard
+        if view is None or view is self.active_view():
+            self.set_keyboard_visible(focused)
 
     def send_key(self, key):
         if key == "Close":
-            self.keyboard_widget.setVisible(False)
-            self.browser.page().runJavaScript(
+            # Input di-blur: dengan tap_queue_wait_input=1 tap kartu ditahan di antrean
+            # sampai ada input yang fokus lagi (disentuh atau di-autofocus halaman)
+            self.flush_keys()
+            self.set_keyboard_visible(False)
+            self.active_view().page().runJavaScript(
                 "var f=document.activeElement;if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){f.blur();}"
             )
             return
         
-        # Mapping untuk tombol khusus
+        # Mapping untuk tombol khusus (dikenali window.__kiosk.type)
         key_mapping = {
-            "⌫": "Backspace",
-            "Caps": "CapsLock",
+            "⌫": "\b",
             "Space": " ",
-            "Enter": "Enter"
+            "Enter": "\n"
         }
         
-        # Gunakan mapping jika ada, else gunakan key asli
-        actual_key = key_mapping.get(key, key)
-        
-        if actual_key == "Enter":
-            js = "var f=document.activeElement;if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){var d=new KeyboardEvent('keydown',{key:'Enter',code:'Enter',keyCode:13,which:13,bubbles:true});var u=new KeyboardEvent('keyup',{key:'Enter',code:'Enter',keyCode:13,which:13,bubbles:true});f.dispatchEvent(d);f.dispatchEvent(u);}"
-        elif actual_key == "Backspace":
-            js = "var f=document.activeElement;if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){f.value=f.value.slice(0,-1);f.dispatchEvent(new Event('input',{bubbles:true}));var u=new KeyboardEvent('keyup',{key:'Backspace',code:'Backspace',keyCode:8,which:8,bubbles:true});f.dispatchEvent(u);}"
-        elif actual_key == " ":
-            js = "var f=document.activeElement;if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){f.value+=' ';f.dispatchEvent(new Event('input',{bubbles:true}));}"
+        if key in key_mapping:
+            char = key_mapping[key]
+        elif key.isalpha():
+            char = key.upper() if self.caps_lock else key.lower()
         else:
-            if actual_key.isalpha():
-                char = actual_key.upper() if self.caps_lock else actual_key.lower()
-            else:
-                char = actual_key
-
-            js = f"""
-            var f=document.activeElement;
-            if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){{
-                f.value+='{char}';
-                f.dispatchEvent(new Event('input',{{bubbles:true}}));
-                var d = new KeyboardEvent('keydown',{{key:'{char}',code:'{char}',keyCode:{ord(char)},which:{ord(char)},bubbles:true}});
-                var u = new KeyboardEvent('keyup',{{key:'{char}',code:'{char}',keyCode:{ord(char)},which:{ord(char)},bubbles:true}});
-                f.dispatchEvent(d); f.dispatchEvent(u);
-            }}
-            """
-        self.browser.page().runJavaScript(js)
+            char = key
+
+        # Kumpulkan tombol, kirim sekaligus di akhir frame (±16 ms)
+        self.key_queue.append(char)
+        if len(self.key_queue) == 1:
+            QTimer.singleShot(self.KEY_FLUSH_MS, self.flush_keys)
+
+    def flush_keys(self):
+        keys, self.key_queue = self.key_queue, []
+        if keys:
+            # tombol masuk ke view yang sedang tampil
+            self.active_view().page().runJavaScript(
+                "window.__kiosk && window.__kiosk.type(%s);" % json.dumps(keys)
+            )
 
     def open_setting_html(self):
         """Tampilkan halaman setting URL (hanya dipanggil setelah login berhasil)"""
-        self.keyboard_widget.setVisible(True)
-
-        # Baca URL lama jika ada
-        try:
-            with open("urlx.txt", "r") as f:
-                current_url = f.read().strip()
-        except:
-            current_url = "https://pesatkantin.com/order-self"
-
-        html = f"""
-        <!DOCTYPE html>
-        <html lang="id">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Setting URL</title>
-            <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
-            <style>
-                body {{
-                    background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    justify-content: center;
-                    align-items: flex-start;
-                    padding: 40px 20px;
-                    font-family: Arial, sans-serif;
-                }}
-                .container {{
-                    background-color: rgba(255, 255, 255, 0.95);
-                    border-radius: 15px;
-                    box-shadow: 0 10px 30px rgba(0, 0, 0, 0.2);
-                    width: 100%;
-                    max-width: 450px;
-                    padding: 30px;
-                    text-align: center;
-                    margin-top: 30px;
-                }}
-                h1 {{
-                    margin-bottom: 20px;
-                    color: #333;
-                }}
-                input[type="text"] {{
-                    width: 90%;
-                    padding: 15px;
-                    border: 2px solid #ddd;
-                    border-radius: 8px;
-                    font-size: 16px;
-                }}
-                .button-group {{
-                    margin-top: 20px;
-                    display: flex;
-                    gap: 15px;
-                }}
-                button {{
-                    flex: 1;
-                    padding: 15px;
-                    border: none;
-                    border-radius: 8px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    cursor: pointer;
-                }}
-                .save-btn {{
-                    background: #38ef7d;
-                    color: white;
-                }}
-                .home-btn {{
-                    background: #eee;
-                }}
-            </style>
-        </head>
-        <body onload="setupChannel()">
-            <div class="container">
-                <h1>Setting URL</h1>
-                <input type="text" id="urlInput" value="{current_url}">
-                <div class="button-group">
-                    <button class="save-btn" onclick="saveUrl()">Simpan</button>
-                    <button class="home-btn" onclick="goHome()">Batal</button>
-                </div>
-            </div>
-            <script>
-                function setupChannel() {{
-                    new QWebChannel(qt.webChannelTransport, function(channel) {{
-                        window.pywebchannel = channel.objects.pywebchannel;
-                    }});
-                }}
-                function saveUrl() {{
-                    var url = document.getElementById('urlInput').value;
-                    if(window.pywebchannel) {{
-                        window.pywebchannel.saveUrl(url);
-                    }}
-                }}
-                function goHome() {{
-                    if(window.pywebchannel) {{
-                        window.pywebchannel.goHome();
-                    }}
-                }}
-            </script>
-        </body>
-        </html>
-        """
-        self.browser.setHtml(html)
-        self.browser.page().runJavaScript("""
-            new QWebChannel(qt.webChannelTransport, function(channel) {
-                window.pywebchannel = channel.objects.pywebchannel;
-            });
-        """)
+        self.set_keyboard_visible(True)
+        # URL saat ini diambil halaman lewat Bridge.currentUrl
+        self.show_admin_page("setting.html")
 
 
     # ===== WiFi Menu =====
     def show_wifi_menu(self, event):
         menu = QMenu(self)
+        self.fill_wifi_menu(menu)
+        if self.wifi_scanner.is_stale():
+            self.wifi_scanner.scan()
+
+        # Hasil scan background langsung mengganti isi menu yang sedang terbuka
+        refill = lambda: self.fill_wifi_menu(menu)
+        self.wifi_scanner.networks_updated.connect(refill)
         try:
-            result = subprocess.run(['nmcli', '-t', '-f', 'SSID,SIGNAL,SECURITY', 'dev', 'wifi'], 
-                                  capture_output=True, text=True)
-            networks = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    parts = line.split(':')
-                    if len(parts) >= 3: 
-                        ssid, signal, sec = parts[0], int(parts[1]), ':'.join(parts[2:])
-                        networks.append((ssid, signal, sec))
-            networks.sort(key=lambda x: x[1], reverse=True)
-            
-            for ssid, signal, sec in networks:
-                act = QAction(f"{ssid} ({signal}%) - {sec}", self)
-                act.triggered.connect(lambda checked, s=ssid: self.open_wifi_html(s))
-                menu.addAction(act)
-        except Exception as e:
-            act = QAction(f"Error: {e}", self)
-            act.setEnabled(False)
+            menu.exec(self.mapToGlobal(self.wifi_indicator.geometry().bottomRight()))
+        finally:
+            self.wifi_scanner.networks_updated.disconnect(refill)
+
+    def fill_wifi_menu(self, menu):
+        """Isi menu dari cache scan WiFi (tanpa memanggil nmcli di thread GUI)."""
+        menu.clear()
+        scanner = self.wifi_scanner
+        for ssid, signal, sec in scanner.networks:
+            act = QAction(f"{ssid} ({signal}%) - {sec}", menu)
+            act.triggered.connect(lambda checked, s=ssid: self.open_wifi_html(s))
             menu.addAction(act)
-        
+        if scanner.scanning or scanner.error or not scanner.networks:
+            if scanner.scanning:
+                text = "Memindai jaringan..."
+            elif scanner.error:
+                text = f"Error: {scanner.error}"
+            else:
+                text = "Tidak ada jaringan"
+            info = QAction(text, menu)
+            info.setEnabled(False)
+            menu.addAction(info)
+
         menu.addSeparator()
-        refresh = QAction("Refresh Networks", self)
+        refresh = QAction("Refresh Networks", menu)
         refresh.triggered.connect(self.refresh_wifi_networks)
         menu.addAction(refresh)
-        
-        menu.exec(self.mapToGlobal(self.wifi_indicator.geometry().bottomRight()))
+        menu.adjustSize()
 
     def open_wifi_html(self, ssid):
         self.current_ssid = ssid
-        self.keyboard_widget.setVisible(True)
-        html = f"""
-        <!DOCTYPE html>
-        <html lang="id">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>WiFi Password</title>
-            <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
-            <style>
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                }}
-                
-                body {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    justify-content: center;
-                    align-items: flex-start;
-                    padding: 40px 20px;
-                }}
-                
-                .container {{
-                    background-color: rgba(255, 255, 255, 0.9);
-                    border-radius: 15px;
-                    box-shadow: 0 10px 30px rgba(0, 0, 0, 0.2);
-                    width: 100%;
-                    max-width: 450px;
-                    padding: 30px;
-                    text-align: center;
-                    margin-top: 30px;
-                }}
-                
-                h1 {{
-                    color: #333;
-                    margin-bottom: 10px;
-                    font-size: 24px;
-                }}
-                
-                .ssid {{
-                    color: #667eea;
-                    font-weight: bold;
-                    font-size: 18px;
-                    margin-bottom: 25px;
-                    word-break: break-word;
-                }}
-                
-                .input-group {{
-                    margin-bottom: 25px;
-                    text-align: left;
-                }}
-                
-                label {{
-                    display: block;
-                    margin-bottom: 8px;
-                    color: #555;
-                    font-weight: 500;
-                }}
-                
-                input[type="text"] {{
-                    width: 100%;
-                    padding: 15px;
-                    border: 2px solid #ddd;
-                    border-radius: 8px;
-                    font-size: 16px;
-                    transition: border-color 0.3s;
-                }}
-                
-                input[type="text"]:focus {{
-                    border-color: #667eea;
-                    outline: none;
-                }}
-                
-                .button-group {{
-                    display: flex;
-                    gap: 15px;
-                }}
-                
-                button {{
-                    flex: 1;
-                    padding: 15px;
-                    border: none;
-                    border-radius: 8px;
-                    font-size: 16px;
-                    font-weight: 600;
-                    cursor: pointer;
-                    transition: all 0.3s ease;
-                }}
-                
-                .connect-btn {{
-                    background-color: #667eea;
-                    color: white;
-                }}
-                
-                .connect-btn:hover {{
-                    background-color: #5a6fd5;
-                    transform: translateY(-2px);
-                }}
-                
-                .home-btn {{
-                    background-color: #f8f9fa;
-                    color: #333;
-                    border: 1px solid #ddd;
-                }}
-                
-                .home-btn:hover {{
-                    background-color: #e9ecef;
-                    transform: translateY(-2px);
-                }}
-                
-                .status-message {{
-                    margin-top: 20px;
-                    padding: 12px;
-                    border-radius: 8px;
-                    display: none;
-                    font-weight: 500;
-                }}
-                
-                .error {{
-                    background-color: #ffebee;
-                    color: #d32f2f;
-                }}
-                
-                .success {{
-                    background-color: #e8f5e9;
-                    color: #388e3c;
-                }}
-                
-                @media (max-width: 480px) {{
-                    .container {{
-                        padding: 20px;
-                    }}
-                    
-                    .button-group {{
-                        flex-direction: column;
-                    }}
-                }}
-            </style>
-        </head>
-        <body onload="setupChannel()">
-            <div class="container">
-                <h1>Masukkan Password WiFi</h1>
-                <div class="ssid" id="ssid-display">{ssid}</div>
-                
-                <div class="input-group">
-                    <label for="wifiPwd">Password</label>
-                    <input type="text" id="wifiPwd" placeholder="Masukkan password WiFi">
-                </div>
-                
-                <div class="button-group">
-                    <button class="connect-btn" onclick="connectWifi()">Connect</button>
-                    <button class="home-btn" onclick="goHome()">Home</button>
-                </div>
-                
-                <div id="statusMessage" class="status-message"></div>
-            </div>
-
-            <script>
-                function setupChannel() {{
-                    new QWebChannel(qt.webChannelTransport, function(channel) {{
-                        window.pywebchannel = channel.objects.pywebchannel;
-                    }});
-                }}
-                
-                function connectWifi() {{
-                    var pwd = document.getElementById('wifiPwd').value;
-                    var statusElement = document.getElementById('statusMessage');
-                    
-                    if (!pwd) {{
-                        statusElement.textContent = "Password tidak boleh kosong!";
-                        statusElement.className = "status-message error";
-                        statusElement.style.display = "block";
-                        return;
-                    }}
-                    
-                    if (window.pywebchannel) {{ 
-                        window.pywebchannel.sendWifiPassword(pwd); 
-                        statusElement.textContent = "Menghubungkan...";
-                        statusElement.className = "status-message success";
-                        statusElement.style.display = "block";
-                    }} else {{ 
-                        statusElement.textContent = "WebChannel belum siap, coba lagi sebentar.";
-                        statusElement.className = "status-message error";
-                        statusElement.style.display = "block";
-                    }}
-                }}
-                
-                function goHome() {{
-                    if (window.pywebchannel) {{ 
-                        window.pywebchannel.goHome(); 
-                    }} else {{
-                        alert("WebChannel belum siap, coba lagi sebentar.");
-                    }}
-                }}
-            </script>
-        </body>
-        </html>
-        """
-        self.browser.setHtml(html)
-        self.browser.page().runJavaScript("""
-            new QWebChannel(qt.webChannelTransport, function(channel) {
-                window.pywebchannel = channel.objects.pywebchannel;
-            });
-        """)
+        self.set_keyboard_visible(True)
+        # SSID diambil halaman lewat Bridge.currentSsid
+        self.show_admin_page("wifi.html")
 
     def run_nmcli_connect(self, ssid, password):
         def worker():
@@ -1311,52 +3034,89 @@ class WebApp(QMainWindow):
         threading.Thread(target=worker, daemon=True).start()
 
     def refresh_wifi_networks(self):
-        try: 
-            subprocess.run(['nmcli', 'dev', 'wifi', 'rescan'], capture_output=True, timeout=10)
-        except Exception as e: 
-            print("Error refreshing WiFi:", e)
+        # rescan bisa makan waktu sampai 10 detik, jalan di background
+        self.wifi_scanner.scan(rescan=True)
 
-    def update_wifi_status(self, ssid, connected):
-        quality = self.wifi_monitor.get_wifi_quality() if connected else 0
+    def update_wifi_status(self, ssid, connected, quality):
         self.wifi_indicator.update_status(ssid, connected, quality)
+        self.stats.update_wifi(connected, quality)
+        # WiFi tersambung lagi -> kirim ulang tap yang tertahan
+        if connected and self.wifi_connected is False:
+            if self.offline_shell:
+                # kembali ke halaman asli begitu jaringan ada; tap dikirim ulang setelah termuat
+                self.retry_start_page()
+            else:
+                QTimer.singleShot(0, self.replay_pending_taps)
+        self.wifi_connected = connected
 
     # ===== RFID =====
-    def handle_rfid(self, rfid_data):
-        print("📡 Dari ESP32 (RFID):", rfid_data, flush=True)
-        
-        try:
-            self.browser.activateWindow()
-            self.browser.setFocus()
-            time.sleep(0.1)
-            
-            pyautogui.typewrite(rfid_data)
-            time.sleep(0.05)
-            pyautogui.press("enter")
-            print("✅ RFID berhasil diinput")
-            
-        except Exception as e:
-            print("❌ Error:", e)
-            # Fallback ke JavaScript
-            js = f"""
-            var f=document.activeElement;
-            if(f&&(f.tagName==='INPUT'||f.tagName==='TEXTAREA')){{
-                f.value='{rfid_data}';
-                f.dispatchEvent(new Event('input',{{bubbles:true}}));
-                f.dispatchEvent(new Event('change',{{bubbles:true}}));
-                var form = f.closest('form');
-                if(form) form.dispatchEvent(new Event('submit', {{bubbles: true}}));
-            }}
-            """
-            self.browser.page().runJavaScript(js)
+    def install_kiosk_script(self, view=None):
+        """Suntik qwebchannel.js + window.__kiosk ke setiap dokumen saat DocumentReady."""
+        from PySide6.QtWebEngineCore import QWebEngineScript
+        script = QWebEngineScript()
+        script.setName("kiosk")
+        script.setSourceCode(load_qwebchannel_js() + KIOSK_JS)
+        script.setInjectionPoint(QWebEngineScript.DocumentReady)
+        script.setWorldId(QWebEngineScript.MainWorld)
+        script.setRunsOnSubFrames(False)
+        (view or self.browser).page().scripts().insert(script)
+
+    def handle_rfid(self, event):
+        print(f"📡 Dari ESP32 ({event.reader}):", event.card_id, flush=True)
+        self.tap_queue.push(event, event.timestamp)
+
+    def on_tap_result(self, seq, ok, attempted=True):
+        read_at = self.tap_queue.result(seq, ok, attempted)
+        if not ok and seq in self.tap_queue:
+            # antrean akan mencoba lagi, belum dihitung gagal
+            return
+        latency = None if read_at is None else (time.monotonic() - read_at) * 1000
+        self.stats.record_tap(ok, latency)
+        if ok and self.journal and seq > 0:
+            self.journal.mark(seq, TapJournal.DELIVERED)
+
+    def replay_pending_taps(self):
+        """Kirim ulang tap dari jurnal yang belum pernah masuk ke halaman.
+
+        Hanya dipanggil saat kembali online (WiFi tersambung lagi / halaman asli termuat lagi
+        setelah salinan offline), bukan tiap halaman dimuat: tiap pesanan memuat ulang halaman
+        dan tap lama tidak boleh masuk ke pesanan pelanggan berikutnya.
+        """
+        if not self.journal:
+            return
+        for event in self.journal.pending(cfg("journal_replay_max_age", 30)):
+            # tap lama tidak ikut dihitung ke latensi; seq yang sudah antre diabaikan
+            if self.tap_queue.push(event, None):
+                print(f"🔁 Kirim ulang tap ({event.reader}):", event.card_id)
 
     def closeEvent(self, event):
-        self.serial_thread.stop()
-        self.focus_timer.stop()
-        self.wifi_monitor.stop()
+        if self.serial_thread:
+            self.serial_thread.stop()
+        if self.journal:
+            self.journal.close()
+        if self.wifi_monitor:
+            self.wifi_monitor.stop()
+        if self.data_sender:
+            self.data_sender.stop()
+        if self.mirror:
+            self.mirror.stop()
         event.accept()
 
 # ===== Run =====
 if __name__ == "__main__":
+    if "--check-import-budget" in sys.argv:
+        sys.exit(check_import_budget(cfg("import_budget_ms", 1500)))
+
+    profile_startup = "--profile-startup" in sys.argv
+    if profile_startup:
+        sys.argv.remove("--profile-startup")
+    profiler = StartupProfiler(profile_startup)
+    profiler.mark("import modul")
+
+    # WebEngine baru di-import setelah jendela tampil, jadi atribut ini wajib diset manual
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
-    window = WebApp()
+    app.setStyleSheet(KEYBOARD_QSS)
+    profiler.mark("QApplication")
+    window = WebApp(profiler)
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Reader RFID palsu di port serial virtual (pty) untuk uji kiosk tanpa ESP32.
+
+    python3 rfid_simulator.py --link /tmp/rfid0 --rate 2 --count 100
+    python3 rfid_simulator.py --link /tmp/rfid0 --mode line --jitter 0.3 --corrupt 0.05
+    python3 rfid_simulator.py --link /tmp/rfid0 --stdin        # ketik ID kartu lalu Enter
+
+Jalankan simulator dulu, lalu isi kiosk.txt: reader1=/tmp/rfid0
+"""
+import os, sys, tty, time, random, argparse, threading
+
+STX = b"\x02"
+ETX = b"\x03"
+# Kartu contoh dari firmware (READER/A.ino)
+DEFAULT_CARD = "1100773C55"
+# Jeda kirim ulang firmware selama kartu masih ditempel (detik)
+FIRMWARE_REPEAT = 2.0
+
+
+def rdm6300_frame(card_id):
+    """STX + 10 hex ID + 2 hex checksum XOR + ETX, sama seperti modul RDM6300."""
+    checksum = 0
+    for i in range(0, 10, 2):
+        checksum ^= int(card_id[i:i + 2], 16)
+    return STX + ("%s%02X" % (card_id, checksum)).encode() + ETX
+
+
+def firmware_line(card_id):
+    """Baris hasil Serial.println(cardId) di firmware ESP32."""
+    return card_id.encode() + b"\r\n"
+
+
+def corrupt(data, rng):
+    """Rusak satu kiriman: potong, ganti karakter jadi non-hex, atau balik satu digit hex."""
+    data = bytearray(data)
+    kind = rng.choice(("truncate", "garbage", "flip"))
+    body = range(1, len(data) - 1) if data[:1] == STX else range(0, 10)
+    pos = rng.choice(body)
+    if kind == "truncate":
+        del data[pos:-1 if data[:1] == STX else -2]
+    elif kind == "garbage":
+        data[pos] = ord("Z")
+    else:
+        # di mode line digit hex lain tetap "valid", hanya checksum frame yang bisa menangkap
+        data[pos] = ord(rng.choice([c for c in "0123456789ABCDEF" if ord(c) != data[pos]]))
+    return bytes(data)
+
+
+class RfidSimulator:
+    """Satu pty: sisi master ditulis simulator, sisi slave dibuka kiosk seperti /dev/ttyACM0."""
+
+    def __init__(self, mode="frame", link=None, seed=None):
+        self.encode = rdm6300_frame if mode == "frame" else firmware_line
+        self.link = link
+        self.rng = random.Random(seed)
+        self.master = self.slave = None
+        self.path = None
+        self.sent = 0
+        self.corrupted = 0
+
+    def open(self):
+        self.master, self.slave = os.openpty()
+        # raw: STX/ETX dan \r\n tidak boleh diolah line discipline sebelum kiosk membuka port
+        tty.setraw(self.slave)
+        self.path = os.ttyname(self.slave)
+        if self.link:
+            try:
+                os.unlink(self.link)
+            except FileNotFoundError:
+                pass
+            os.symlink(self.path, self.link)
+        return self.link or self.path
+
+    def send(self, card_id, corrupt_rate=0.0):
+        """Tulis satu tap, kembalikan time.time() saat byte terakhir ditulis."""
+        data = self.encode(card_id.upper())
+        if corrupt_rate and self.rng.random() < corrupt_rate:
+            data = corrupt(data, self.rng)
+            self.corrupted += 1
+        os.write(self.master, data)
+        self.sent += 1
+        return time.time()
+
+    def run(self, cards, rate, count=0, jitter=0.0, corrupt_rate=0.0, repeat=1,
+            on_send=None, stop=None):
+        """Kirim tap dengan laju rate/detik (jitter = simpangan relatif jeda).
+
+        repeat > 1 meniru kartu yang ditahan: ID sama dikirim ulang tiap FIRMWARE_REPEAT detik.
+        cards boleh list ID atau fungsi n -> ID.
+        """
+        stop = stop or threading.Event()
+        period = 1.0 / rate
+        next_at = time.perf_counter()
+        n = 0
+        while not stop.is_set() and (not count or n < count):
+            card_id = cards(n) if callable(cards) else self.rng.choice(cards)
+            for r in range(repeat):
+                if r:
+                    stop.wait(FIRMWARE_REPEAT)
+                sent_at = self.send(card_id, corrupt_rate)
+                if on_send:
+                    on_send(card_id, sent_at)
+            n += 1
+            next_at += period * (1 + self.rng.uniform(-jitter, jitter))
+            # jadwal absolut supaya laju tidak melorot karena waktu tulis
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+        return n
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = None
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+
+
+def load_cards(path):
+    with open(path) as f:
+        cards = [line.strip().lstrip("!").split("#")[0].strip() for line in f]
+    return [c.upper() for c in cards if len(c) == 10]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link", help="symlink ke pty, untuk reader1= di kiosk.txt")
+    parser.add_argument("--mode", choices=("frame", "line"), default="frame",
+                        help="frame = RDM6300 mentah, line = keluaran firmware (10 hex + CRLF)")
+    parser.add_argument("--rate", type=float, default=1.0, help="tap per detik")
+    parser.add_argument("--count", type=int, default=0, help="jumlah tap (0 = terus)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="simpangan jeda, 0..1")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="peluang kiriman rusak")
+    parser.add_argument("--repeat", type=int, default=1, help="kiriman per tap (kartu ditahan)")
+    parser.add_argument("--cards", help="file daftar kartu (format cards.txt)")
+    parser.add_argument("--card", action="append", help="ID kartu (boleh berulang)")
+    parser.add_argument("--stdin", action="store_true", help="kirim ID yang diketik")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    cards = args.card or (load_cards(args.cards) if args.cards else [DEFAULT_CARD])
+    sim = RfidSimulator(args.mode, args.link, args.seed)
+    print("🔌 Reader palsu siap di", sim.open(), f"({sim.path})", flush=True)
+    try:
+        if args.stdin:
+            for line in sys.stdin:
+                card_id = line.strip()
+                if len(card_id) == 10:
+                    sim.send(card_id, args.corrupt)
+                    print("📤", card_id.upper(), flush=True)
+                elif card_id:
+                    print("⚠️ ID kartu harus 10 karakter hex")
+        else:
+            def report(card_id, sent_at):
+                print("📤", card_id, flush=True)
+
+            sim.run(cards, args.rate, args.count, args.jitter, args.corrupt, args.repeat, report)
+            # beri waktu kiosk membaca sisa data sebelum pty ditutup
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 terkirim {sim.sent}, dirusak {sim.corrupted}")
+        sim.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ HardwareSerial RFID(1);  // gunakan Serial2 -> instance 2
 
 String textBuffer = "";
 String CardNumber = "1100773C55"; // contoh ID akses yang diterima
+// true = teruskan frame mentah STX..ETX (dengan checksum) ke host untuk divalidasi di Python
+const bool KIRIM_FRAME_MENTAH = false;
 
 void setup() {
   // Serial USB untuk debug
@@ -65,7 +67,11 @@ void processFrame(const String &raw) {
 
     unsigned long now = millis();
     if (now - lastPrintMillis >= printInterval) {
-      Serial.println(cardId);   // cuma cetak sekali tiap 2 detik
+      if (KIRIM_FRAME_MENTAH) {
+        Serial.print(raw);      // host cek checksum XOR sendiri
+      } else {
+        Serial.println(cardId);   // cuma cetak sekali tiap 2 detik
+      }
       lastPrintMillis = now;
 
       if (CardNumber.indexOf(cardId) >= 0) {